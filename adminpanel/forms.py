@@ -1,8 +1,26 @@
 from django import forms
+from django.db import transaction
 from hr.models import HR
 import re
 
-class HRRegistrationForm(forms.ModelForm):
+class HRDesignationIndexMixin:
+    """
+    Keep the HR's HRDesignation rows in step with designations_handled on save.
+
+    With commit=False the caller saves the HR and must call
+    ``hr.sync_designations()`` itself.
+    """
+
+    def save(self, commit=True):
+        if not commit:
+            return super().save(commit=False)
+        with transaction.atomic():
+            hr = super().save()
+            hr.sync_designations()
+        return hr
+
+
+class HRRegistrationForm(HRDesignationIndexMixin, forms.ModelForm):
     # Designation choices based on field
     IT_DESIGNATIONS = [
         'Software Developer', 'Java Developer', 'Python Developer', 'Frontend Developer',
@@ -174,7 +192,7 @@ class HRRegistrationForm(forms.ModelForm):
         return cleaned_data
 
 
-class HREditForm(forms.ModelForm):
+class HREditForm(HRDesignationIndexMixin, forms.ModelForm):
     IT_DESIGNATIONS = HRRegistrationForm.IT_DESIGNATIONS
     NON_IT_DESIGNATIONS = HRRegistrationForm.NON_IT_DESIGNATIONS
 
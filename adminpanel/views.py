@@ -2,6 +2,7 @@
 
 from django.shortcuts import render, redirect
 from django.contrib import messages
+from django.db import transaction
 from .models import Admin
 from .forms import HRRegistrationForm, HREditForm
 from hr.models import HR
@@ -79,8 +80,10 @@ def hr_registration_view(request):
                 provided_password = form.cleaned_data['password']
                 hr.set_password(provided_password)
 
-                # Save the HR object
-                hr.save()
+                # Save the HR object and index its designations together
+                with transaction.atomic():
+                    hr.save()
+                    hr.sync_designations()
 
                 messages.success(request, f"HR '{hr.full_name}' registered successfully.")
                 return redirect('manage_hr')
@@ -0,0 +1,193 @@
+# ai_interview_platform/resume_storage.py
+import os
+import hashlib
+import posixpath
+import tempfile
+from urllib.parse import quote
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import Storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from ai_interview_platform.supabase_storage import SupabaseStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class LocalResumeStorage(Storage):
+    """
+    Filesystem stand-in for SupabaseStorage, for staging and offline load tests.
+
+    Same semantics as the Supabase backend: the 'resumes/' prefix is stripped
+    (the bucket is the top-level directory), saves overwrite (upsert), and
+    url() returns a public URL (under MEDIA_URL). Files are sharded into
+    two-level directories by name hash so no directory grows unbounded, and
+    every write lands in a temp file that is renamed into place, so readers
+    never see a partial resume.
+    """
+
+    def __init__(self, location=None, base_url=None, bucket='resumes'):
+        self._location = location
+        self._base_url = base_url
+        self.bucket = bucket
+
+    @property
+    def location(self):
+        return self._location or settings.MEDIA_ROOT
+
+    @property
+    def base_url(self):
+        return self._base_url or settings.MEDIA_URL
+
+    def _object_key(self, name):
+        # Remove 'resumes/' prefix if present (bucket is already 'resumes')
+        file_name = name.replace('resumes/', '')
+        digest = hashlib.sha256(file_name.encode('utf-8')).hexdigest()
+        return f"{self.bucket}/{digest[:2]}/{digest[2:4]}/{file_name}"
+
+    def path(self, name):
+        return os.path.join(self.location, *self._object_key(name).split('/'))
+
+    def _save(self, name, content):
+        target = self.path(name)
+        directory = os.path.dirname(target)
+        os.makedirs(directory, exist_ok=True)
+
+        handle, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(handle, 'wb') as tmp:
+                for chunk in content.chunks():
+                    tmp.write(chunk)
+            os.replace(temp_path, target)  # Atomic within the same directory; overwrites like upsert
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        return name
+
+    def _open(self, name, mode='rb'):
+        return File(open(self.path(name), mode), name=name)
+
+    def url(self, name):
+        return self.base_url + quote(self._object_key(name))
+
+    def exists(self, name):
+        return False  # Always allow upload, matching SupabaseStorage
+
+    def size(self, name):
+        return os.path.getsize(self.path(name))
+
+    def delete(self, name):
+        try:
+            os.unlink(self.path(name))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Local resume delete error: {e}")
+
+
+class ContentAddressedMixin:
+    """
+    Stores each distinct file once, under the SHA-256 of its bytes.
+
+    Saving bytes that are already stored only adds a reference in the
+    ResumeObject table and skips the upload. delete() drops a reference and
+    removes the object only when the last one goes. Because names come from
+    content, two candidates' files can no longer overwrite each other.
+    Names saved before this scheme were shared by every candidate who uploaded
+    a file with the same name; migration 0017 counts their references. A name
+    with no ResumeObject row is never removed, since another profile may
+    still point at it.
+    """
+
+    def content_name(self, name, content_hash):
+        directory = posixpath.dirname(name.replace('\\', '/'))
+        extension = os.path.splitext(name)[1].lower()
+        return posixpath.join(directory, f"{content_hash}{extension}")
+
+    def _hash_content(self, content):
+        # Callers that already hashed the upload while reading it attach the digest
+        precomputed = getattr(content, 'content_hash', None)
+        if precomputed:
+            return precomputed, content.size
+        hasher = hashlib.sha256()
+        size = 0
+        for chunk in content.chunks():
+            hasher.update(chunk)
+            size += len(chunk)
+        content.seek(0)
+        return hasher.hexdigest(), size
+
+    def _add_reference(self, name, content_hash, size):
+        from candidate.models import ResumeObject
+
+        if ResumeObject.objects.filter(name=name).update(ref_count=F('ref_count') + 1):
+            return
+        try:
+            with transaction.atomic():
+                ResumeObject.objects.create(name=name, content_hash=content_hash, size=size, ref_count=1)
+        except IntegrityError:
+            # The same bytes finished uploading concurrently
+            ResumeObject.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+
+    def _save(self, name, content):
+        from candidate.models import ResumeObject
+
+        content_hash, size = self._hash_content(content)
+        key = self.content_name(name, content_hash)
+
+        # A row only exists once its object is uploaded, so a hit means no network upload
+        if ResumeObject.objects.filter(name=key).update(ref_count=F('ref_count') + 1):
+            print(f"♻️ Resume already stored as {key}")
+            return key
+
+        super()._save(key, content)
+        self._add_reference(key, content_hash, size)
+        return key
+
+    def exists(self, name):
+        from candidate.models import ResumeObject
+        return ResumeObject.objects.filter(name=name).exists()
+
+    def delete(self, name):
+        from candidate.models import ResumeObject
+
+        if not name:
+            return
+        with transaction.atomic():
+            stored = ResumeObject.objects.select_for_update().filter(name=name).first()
+            if stored is None:
+                print(f"⚠️ Keeping untracked resume {name}")
+            elif stored.ref_count > 1:
+                ResumeObject.objects.filter(pk=stored.pk).update(ref_count=F('ref_count') - 1)
+            else:
+                # Removed while the row is locked so a concurrent save re-uploads instead of
+                # counting a reference to an object that is about to disappear
+                super().delete(name)
+                stored.delete()
+
+
+class ContentAddressedLocalResumeStorage(ContentAddressedMixin, LocalResumeStorage):
+    pass
+
+
+class ContentAddressedSupabaseStorage(ContentAddressedMixin, SupabaseStorage):
+    pass
+
+
+_resume_storage = None
+
+
+def get_resume_storage():
+    """
+    Storage backend for resumes, chosen by RESUME_STORAGE_BACKEND
+    ('supabase' or 'local'). Used as a callable FileField storage so
+    the choice is made from settings rather than baked into migrations.
+    """
+    global _resume_storage
+    if _resume_storage is None:
+        if getattr(settings, 'RESUME_STORAGE_BACKEND', 'supabase') == 'local':
+            _resume_storage = ContentAddressedLocalResumeStorage()
+        else:
+            _resume_storage = ContentAddressedSupabaseStorage()
+    return _resume_storage
@@ -100,6 +100,42 @@ DATABASES = {
 OTP_EXPIRY_MINUTES = 10
 OTP_LENGTH = 4
 
+# AI answer evaluation: max Gemini calls in flight per interview
+AI_EVALUATION_MAX_WORKERS = int(os.environ.get('AI_EVALUATION_MAX_WORKERS', '5'))
+# Score all answers of an interview in one Gemini request (falls back to per-answer calls)
+AI_EVALUATION_BATCH = os.environ.get('AI_EVALUATION_BATCH', 'True').lower() in ('true', '1', 'yes')
+# Seconds interview_complete waits on answers still being scored in the background
+AI_EVALUATION_COLLECT_TIMEOUT = int(os.environ.get('AI_EVALUATION_COLLECT_TIMEOUT', '30'))
+# Persistent cache of validated evaluations (seconds / max rows)
+AI_EVALUATION_CACHE_TTL = int(os.environ.get('AI_EVALUATION_CACHE_TTL', str(7 * 24 * 3600)))
+AI_EVALUATION_CACHE_MAX_ENTRIES = int(os.environ.get('AI_EVALUATION_CACHE_MAX_ENTRIES', '10000'))
+# Expired/over-bound cache entries are culled on about one store in N (the table may briefly exceed its bound)
+AI_EVALUATION_CACHE_CULL_EVERY = int(os.environ.get('AI_EVALUATION_CACHE_CULL_EVERY', '50'))
+
+# Gemini resilience: open the breaker after N consecutive failures, probe again after the reset window
+GEMINI_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('GEMINI_BREAKER_FAILURE_THRESHOLD', '5'))
+GEMINI_BREAKER_RESET_SECONDS = int(os.environ.get('GEMINI_BREAKER_RESET_SECONDS', '60'))
+# Per-request time budgets for Gemini calls before falling back to local scorers/questions
+GEMINI_EVALUATION_DEADLINE_SECONDS = int(os.environ.get('GEMINI_EVALUATION_DEADLINE_SECONDS', '45'))
+GEMINI_QUESTION_DEADLINE_SECONDS = int(os.environ.get('GEMINI_QUESTION_DEADLINE_SECONDS', '20'))
+
+# Pre-generated question bank per (role, designation, difficulty)
+QUESTION_BANK_LOW_WATER = int(os.environ.get('QUESTION_BANK_LOW_WATER', '10'))
+QUESTION_BANK_TARGET = int(os.environ.get('QUESTION_BANK_TARGET', '30'))
+
+# Resume parsing budget: stop extracting after N pages / characters, or once N distinct keywords decide the field
+RESUME_MAX_PAGES = int(os.environ.get('RESUME_MAX_PAGES', '10'))
+RESUME_MAX_CHARS = int(os.environ.get('RESUME_MAX_CHARS', '50000'))
+RESUME_CONFIDENT_HITS = int(os.environ.get('RESUME_CONFIDENT_HITS', '8'))
+# Resume parses run in child processes: max concurrent parses, wall-clock seconds and address-space cap per parse
+RESUME_PARSE_WORKERS = int(os.environ.get('RESUME_PARSE_WORKERS', '2'))
+RESUME_PARSE_TIMEOUT = int(os.environ.get('RESUME_PARSE_TIMEOUT', '30'))
+RESUME_PARSE_MEMORY_MB = int(os.environ.get('RESUME_PARSE_MEMORY_MB', '512'))
+# Seconds before a Supabase storage request (upload / delete) gives up
+SUPABASE_STORAGE_TIMEOUT = int(os.environ.get('SUPABASE_STORAGE_TIMEOUT', '20'))
+# Page size of the HR and candidate interview lists
+INTERVIEWS_PER_PAGE = int(os.environ.get('INTERVIEWS_PER_PAGE', '20'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -151,6 +187,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Supabase Storage (resumes)
 SUPABASE_URL = os.environ.get('SUPABASE_URL')
 SUPABASE_ANON_KEY = os.environ.get('SUPABASE_ANON_KEY')
+# Resume storage backend: 'supabase', or 'local' to write under MEDIA_ROOT (staging / offline load tests)
+RESUME_STORAGE_BACKEND = os.environ.get('RESUME_STORAGE_BACKEND', 'supabase')
 
 # Media URL and Root (for backward compatibility; resume files go to Supabase)
 MEDIA_URL = '/media/'
@@ -191,3 +229,13 @@ DEFAULT_FROM_EMAIL = os.environ.get(
     "AI Mock Interview <aimockinterview07@gmail.com>",
 )
 SERVER_EMAIL = DEFAULT_FROM_EMAIL
+
+# Email outbox delivery: per-request timeout, attempts before giving up, first retry delay
+# (doubling each attempt, capped) and max Brevo calls per second per process
+EMAIL_SEND_TIMEOUT = int(os.environ.get('EMAIL_SEND_TIMEOUT', '10'))
+EMAIL_MAX_ATTEMPTS = int(os.environ.get('EMAIL_MAX_ATTEMPTS', '5'))
+EMAIL_RETRY_BASE_SECONDS = int(os.environ.get('EMAIL_RETRY_BASE_SECONDS', '5'))
+EMAIL_RETRY_MAX_SECONDS = int(os.environ.get('EMAIL_RETRY_MAX_SECONDS', '600'))
+EMAIL_RATE_PER_SECOND = float(os.environ.get('EMAIL_RATE_PER_SECOND', '5'))
+# Days finished (sent / failed) outbox rows are kept before send_outbox_emails deletes them
+EMAIL_OUTBOX_RETENTION_DAYS = int(os.environ.get('EMAIL_OUTBOX_RETENTION_DAYS', '7'))
@@ -1,33 +1,87 @@
 # ai_interview_platform/supabase_storage.py
 import os
-from supabase import create_client
+import threading
+from functools import lru_cache
+from io import BufferedReader, FileIO
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from django.core.files.storage import Storage
 from django.utils.deconstruct import deconstructible
 
+# One client per process, built on first use. Its storage API keeps a single
+# HTTP connection pool (keep-alive) that every upload, URL and delete reuses;
+# nothing is constructed at import, so migrations and tests need no credentials.
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_supabase_client():
+    """Shared Supabase client for this process."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from supabase import create_client, ClientOptions
+
+                url = os.environ.get('SUPABASE_URL')
+                key = os.environ.get('SUPABASE_ANON_KEY')
+                if not url or not key:
+                    raise ImproperlyConfigured("SUPABASE_URL and SUPABASE_ANON_KEY must be set to store resumes")
+                _client = create_client(url, key, options=ClientOptions(
+                    storage_client_timeout=getattr(settings, 'SUPABASE_STORAGE_TIMEOUT', 20),
+                    auto_refresh_token=False,
+                    persist_session=False,
+                ))
+    return _client
+
+
+@lru_cache(maxsize=4096)
+def _public_url(base_url, bucket, file_name):
+    # Same string the SDK's get_public_url() builds, without touching the client
+    return f"{base_url}/storage/v1/object/public/{bucket}/{file_name}?"
+
 
 @deconstructible
 class SupabaseStorage(Storage):
     def __init__(self):
-        url = os.environ.get('SUPABASE_URL')
-        key = os.environ.get('SUPABASE_ANON_KEY')
-        self.client = create_client(url, key)
         self.bucket = 'resumes'
 
+    @property
+    def client(self):
+        return get_supabase_client()
+
+    def _bucket_api(self):
+        return self.client.storage.from_(self.bucket)
+
+    def _upload_source(self, content):
+        """
+        What to hand the Supabase client: an open file or a path on disk is
+        streamed from disk in chunks; anything else has to be read into memory.
+        An open file is borrowed, not closed: whoever opened it closes it.
+        """
+        stream = getattr(content, 'file', content)
+        if isinstance(stream, (BufferedReader, FileIO)):
+            stream.seek(0)
+            return stream
+        if hasattr(content, 'temporary_file_path'):
+            return content.temporary_file_path()
+        return content.read()
+
     def _save(self, name, content):
-        file_bytes = content.read()
         # Remove 'resumes/' prefix if present (bucket is already 'resumes')
         file_name = name.replace('resumes/', '')
-        self.client.storage.from_(self.bucket).upload(
+        self._bucket_api().upload(
             file_name,
-            file_bytes,
+            self._upload_source(content),
             {"content-type": "application/pdf", "upsert": "true"}
         )
         return name
 
     def url(self, name):
+        # Rendered once per row in HR candidate lists; computed locally and memoized per process
         file_name = name.replace('resumes/', '')
-        res = self.client.storage.from_(self.bucket).get_public_url(file_name)
-        return res
+        base_url = (os.environ.get('SUPABASE_URL') or '').rstrip('/')
+        return _public_url(base_url, self.bucket, file_name)
 
     def exists(self, name):
         return False  # Always allow upload
@@ -35,6 +89,6 @@ class SupabaseStorage(Storage):
     def delete(self, name):
         file_name = name.replace('resumes/', '')
         try:
-            self.client.storage.from_(self.bucket).remove([file_name])
+            self._bucket_api().remove([file_name])
         except Exception as e:
             print(f"Supabase delete error: {e}")
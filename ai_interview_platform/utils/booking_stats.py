@@ -0,0 +1,40 @@
+# HR interview booking counters, computed in a single aggregate query
+from django.db.models import Count, Q
+from django.utils import timezone
+from hr.models import HRInterviewBooking
+
+def get_booking_stats(hr, start_date=None, end_date=None, now=None):
+    """
+    Count an HR's bookings by status, plus today's and upcoming scheduled ones.
+
+    Every counter is a filtered COUNT in the same SELECT, so the whole set
+    costs one query.
+
+    Args:
+        hr: HR whose bookings are counted
+        start_date, end_date: Optional inclusive slot date range
+        now: Aware datetime to count "today" and "upcoming" from (default: now)
+
+    Returns:
+        dict: total, scheduled, completed, cancelled, no_show, today_scheduled, upcoming
+    """
+    now = timezone.localtime(now) if now else timezone.localtime()
+    today = now.date()
+
+    bookings = HRInterviewBooking.objects.filter(hr=hr)
+    if start_date:
+        bookings = bookings.filter(time_slot__date__gte=start_date)
+    if end_date:
+        bookings = bookings.filter(time_slot__date__lte=end_date)
+
+    scheduled = Q(status='scheduled')
+    upcoming = HRInterviewBooking.upcoming_q(now)
+    return bookings.aggregate(
+        total=Count('pk'),
+        scheduled=Count('pk', filter=scheduled),
+        completed=Count('pk', filter=Q(status='completed')),
+        cancelled=Count('pk', filter=Q(status='cancelled')),
+        no_show=Count('pk', filter=Q(status='no_show')),
+        today_scheduled=Count('pk', filter=scheduled & Q(time_slot__date=today)),
+        upcoming=Count('pk', filter=upcoming),
+    )
@@ -1,11 +1,45 @@
+import time
+import random
+import threading
+from datetime import timedelta
 import requests
+from requests.adapters import HTTPAdapter
 from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
 from email.utils import parseaddr
+from candidate.models import OutboxEmail
 
+BREVO_SEND_URL = "https://api.brevo.com/v3/smtp/email"
+DEFAULT_TEXT_CONTENT = "AI Interview Platform Email"
 
-def send_brevo_email(to_email, subject, html_content):
-    url = "https://api.brevo.com/v3/smtp/email"
+# ================== POOLED HTTP SESSION ==================
+# One keep-alive session per process: consecutive sends reuse the TLS
+# connection to Brevo instead of opening a new one per email.
 
+_session = None
+_session_lock = threading.Lock()
+
+def _get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+                _session = session
+    return _session
+
+class BrevoSendError(Exception):
+    """A Brevo send failed; ``retryable`` says whether trying again can help."""
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+def _post_brevo(to_email, subject, html_content, text_content=None):
+    """Send one email through the Brevo API. Raises BrevoSendError on failure."""
     headers = {
         "accept": "application/json",
         "api-key": settings.BREVO_API_KEY,
@@ -21,13 +55,195 @@ def send_brevo_email(to_email, subject, html_content):
         "to": [{"email": to_email}],
         "subject": subject,
         "htmlContent": html_content,
-        "textContent": "AI Interview Platform Email"
+        "textContent": text_content or DEFAULT_TEXT_CONTENT
     }
 
-    response = requests.post(url, json=data, headers=headers)
+    try:
+        response = _get_session().post(
+            BREVO_SEND_URL, json=data, headers=headers,
+            timeout=getattr(settings, "EMAIL_SEND_TIMEOUT", 10)
+        )
+    except requests.RequestException as e:
+        raise BrevoSendError(f"{type(e).__name__}: {e}")
 
     # 🔥 LOG RESPONSE
     print("BREVO STATUS:", response.status_code)
     print("BREVO RESPONSE:", response.text)
 
-    return response.status_code == 201
+    if response.status_code == 201:
+        return
+    # Throttling and provider errors are worth retrying; other 4xx are our request's fault
+    retryable = response.status_code == 429 or response.status_code >= 500
+    raise BrevoSendError(f"Brevo returned {response.status_code}: {response.text[:500]}", retryable=retryable)
+
+def send_brevo_email(to_email, subject, html_content, text_content=None):
+    """Send immediately (no outbox). Returns True when Brevo accepted the email."""
+    try:
+        _post_brevo(to_email, subject, html_content, text_content)
+        return True
+    except BrevoSendError as e:
+        print(f"❌ Brevo send failed: {e}")
+        return False
+
+# ================== RATE LIMITING ==================
+class _RateLimiter:
+    """Token bucket shared by the sending threads of this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = None
+        self._updated = time.monotonic()
+
+    def acquire(self):
+        rate = getattr(settings, "EMAIL_RATE_PER_SECOND", 5)
+        if rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if self._tokens is None:
+                    self._tokens = rate
+                self._tokens = min(rate, self._tokens + (now - self._updated) * rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / rate
+            time.sleep(wait)
+
+_rate_limiter = _RateLimiter()
+
+# ================== OUTBOX ==================
+def enqueue_email(to_email, subject, html_content, text_content=""):
+    """
+    Queue an email in the outbox and return straight away.
+
+    Delivery starts on a background thread once the request's transaction
+    commits; anything it misses is sent by the send_outbox_emails command.
+    """
+    message = OutboxEmail.objects.create(
+        to_email=to_email,
+        subject=subject,
+        html_content=html_content,
+        text_content=text_content or ""
+    )
+    transaction.on_commit(schedule_outbox_drain)
+    return message
+
+def _retry_delay(attempts):
+    base = getattr(settings, "EMAIL_RETRY_BASE_SECONDS", 5)
+    cap = getattr(settings, "EMAIL_RETRY_MAX_SECONDS", 600)
+    delay = min(cap, base * (2 ** (attempts - 1)))
+    # Jitter keeps retries from several workers from arriving in lockstep
+    return delay * random.uniform(0.8, 1.2)
+
+def _claim_due_messages(limit):
+    now = timezone.now()
+    due_ids = list(OutboxEmail.objects.filter(
+        status="pending", next_attempt_at__lte=now
+    ).order_by("next_attempt_at").values_list("pk", flat=True)[:limit])
+
+    claimed = []
+    for message_id in due_ids:
+        if OutboxEmail.objects.filter(pk=message_id, status="pending").update(
+            status="sending", claimed_at=now, attempts=F("attempts") + 1
+        ):
+            claimed.append(message_id)
+    return list(OutboxEmail.objects.filter(pk__in=claimed).order_by("next_attempt_at"))
+
+def deliver_message(message):
+    """Send one claimed outbox message and record the outcome."""
+    _rate_limiter.acquire()
+    started = time.monotonic()
+    try:
+        _post_brevo(message.to_email, message.subject, message.html_content, message.text_content)
+    except BrevoSendError as e:
+        max_attempts = getattr(settings, "EMAIL_MAX_ATTEMPTS", 5)
+        message.last_error = str(e)
+        if e.retryable and message.attempts < max_attempts:
+            message.status = "pending"
+            message.next_attempt_at = timezone.now() + timedelta(seconds=_retry_delay(message.attempts))
+        else:
+            message.status = "failed"
+            # Bodies carry OTPs; nothing will read them again
+            message.html_content = message.text_content = ""
+            print(f"❌ Email to {message.to_email} failed after {message.attempts} attempt(s): {e}")
+        message.save(update_fields=["status", "next_attempt_at", "last_error", "html_content", "text_content"])
+        return False
+
+    message.status = "sent"
+    message.sent_at = timezone.now()
+    message.request_ms = int((time.monotonic() - started) * 1000)
+    message.latency_ms = int((message.sent_at - message.created_at).total_seconds() * 1000)
+    message.last_error = ""
+    # Bodies carry OTPs; keep only the delivery record once Brevo has the email
+    message.html_content = message.text_content = ""
+    message.save(update_fields=[
+        "status", "sent_at", "request_ms", "latency_ms", "last_error", "html_content", "text_content"
+    ])
+    return True
+
+def drain_outbox(batch_size=20, stale_after_seconds=300):
+    """
+    Send every due outbox message. Returns (sent, failed_attempts).
+
+    Messages stuck in "sending" longer than ``stale_after_seconds`` lost their
+    worker and go back in the queue.
+    """
+    OutboxEmail.objects.filter(
+        status="sending", claimed_at__lte=timezone.now() - timedelta(seconds=stale_after_seconds)
+    ).update(status="pending")
+
+    sent = failed = 0
+    while True:
+        batch = _claim_due_messages(batch_size)
+        if not batch:
+            return sent, failed
+        for message in batch:
+            if deliver_message(message):
+                sent += 1
+            else:
+                failed += 1
+
+def purge_outbox(retention_days=None):
+    """Delete sent and failed outbox rows older than EMAIL_OUTBOX_RETENTION_DAYS. Returns the count."""
+    if retention_days is None:
+        retention_days = getattr(settings, "EMAIL_OUTBOX_RETENTION_DAYS", 7)
+    deleted, _ = OutboxEmail.objects.filter(
+        status__in=["sent", "failed"],
+        created_at__lt=timezone.now() - timedelta(days=retention_days)
+    ).delete()
+    return deleted
+
+_drain_running = False
+_drain_lock = threading.Lock()
+
+def schedule_outbox_drain():
+    """Drain the outbox on a background thread (one drain per process at a time)."""
+    global _drain_running
+    with _drain_lock:
+        if _drain_running:
+            return
+        _drain_running = True
+
+    def _drain():
+        global _drain_running
+        try:
+            while True:
+                drain_outbox()
+                with _drain_lock:
+                    # Anything enqueued while we were finishing would otherwise wait for the command
+                    if not _has_due_messages():
+                        _drain_running = False
+                        return
+        except Exception as e:
+            print(f"Email outbox drain failed: {e}")
+            with _drain_lock:
+                _drain_running = False
+        finally:
+            connections.close_all()
+
+    threading.Thread(target=_drain, name="email-outbox", daemon=True).start()
+
+def _has_due_messages():
+    return OutboxEmail.objects.filter(status="pending", next_attempt_at__lte=timezone.now()).exists()
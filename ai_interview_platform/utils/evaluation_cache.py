@@ -0,0 +1,108 @@
+# Persistent cache of AI answer evaluations
+import re
+import random
+import hashlib
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+from candidate.models import EvaluationCacheEntry
+
+# Process-wide counters, see get_cache_stats()
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+_stats_lock = threading.Lock()
+
+def _count(stat, amount=1):
+    with _stats_lock:
+        _stats[stat] += amount
+
+def get_cache_stats():
+    """Hit/miss counters for this process since start-up."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    return stats
+
+def _normalize(text):
+    return re.sub(r'\s+', ' ', (text or "").strip()).lower()
+
+def make_cache_key(question, cleaned_answer, role, designation, mode, rubric_version):
+    """Content hash of everything that influences an evaluation."""
+    parts = [
+        rubric_version,
+        _normalize(question),
+        _normalize(cleaned_answer),
+        _normalize(role),
+        _normalize(designation),
+        _normalize(mode),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+def get_cached_evaluation(key):
+    """Return a fresh cached evaluation for ``key`` or None."""
+    ttl = getattr(settings, "AI_EVALUATION_CACHE_TTL", 7 * 24 * 3600)
+    try:
+        entry = EvaluationCacheEntry.objects.filter(
+            key=key, created_at__gte=timezone.now() - timedelta(seconds=ttl)
+        ).first()
+        if entry is None:
+            _count("misses")
+            return None
+
+        EvaluationCacheEntry.objects.filter(pk=entry.pk).update(
+            hit_count=F("hit_count") + 1, last_used_at=timezone.now()
+        )
+        _count("hits")
+        return entry.result
+    except Exception as e:
+        # The cache must never break an evaluation
+        print(f"Evaluation cache lookup failed: {e}")
+        _count("misses")
+        return None
+
+def store_evaluation(key, result):
+    """
+    Cache a validated evaluation.
+
+    The TTL and size bound are enforced on roughly one store in
+    AI_EVALUATION_CACHE_CULL_EVERY, so most writes cost no extra queries.
+    """
+    try:
+        now = timezone.now()
+        # Plain UPDATE-then-INSERT keeps concurrent evaluation threads from holding row locks
+        refreshed = EvaluationCacheEntry.objects.filter(key=key).update(
+            result=result, created_at=now, last_used_at=now, hit_count=0
+        )
+        if not refreshed:
+            try:
+                EvaluationCacheEntry.objects.create(key=key, result=result)
+            except IntegrityError:
+                # Another thread cached the same answer first
+                pass
+        _count("stores")
+        cull_every = getattr(settings, "AI_EVALUATION_CACHE_CULL_EVERY", 50)
+        if cull_every <= 1 or random.random() < 1.0 / cull_every:
+            _cull(now)
+    except Exception as e:
+        print(f"Evaluation cache store failed: {e}")
+
+def _cull(now):
+    ttl = getattr(settings, "AI_EVALUATION_CACHE_TTL", 7 * 24 * 3600)
+    max_entries = getattr(settings, "AI_EVALUATION_CACHE_MAX_ENTRIES", 10000)
+
+    evicted, _ = EvaluationCacheEntry.objects.filter(created_at__lt=now - timedelta(seconds=ttl)).delete()
+
+    # Least recently used entries go first once the table is over its bound
+    excess = EvaluationCacheEntry.objects.count() - max_entries
+    if excess > 0:
+        stale_ids = list(
+            EvaluationCacheEntry.objects.order_by("last_used_at").values_list("pk", flat=True)[:excess]
+        )
+        deleted, _ = EvaluationCacheEntry.objects.filter(pk__in=stale_ids).delete()
+        evicted += deleted
+
+    if evicted:
+        _count("evictions", evicted)
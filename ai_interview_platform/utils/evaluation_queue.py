@@ -0,0 +1,174 @@
+# Background evaluation of interview answers as they are submitted
+import time
+import threading
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from candidate.models import AnswerEvaluationJob
+from ai_interview_platform.utils.evaluator import evaluate_answer, evaluate_interview_answers, get_evaluation_deadline
+
+# ================== LOCAL WORKER POOL ==================
+# Jobs live in the DB; this per-process pool only decides *when* they run.
+# Anything it never gets to (worker restart, timeout) is picked up by
+# collect_interview_evaluations() or the process_evaluation_jobs command.
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "AI_EVALUATION_MAX_WORKERS", 5),
+                    thread_name_prefix="eval-queue"
+                )
+    return _executor
+
+def _run_job_in_thread(job_id):
+    try:
+        run_job(job_id)
+    except Exception as e:
+        print(f"Evaluation job {job_id} crashed: {e}")
+    finally:
+        # Worker threads get their own DB connections; don't leak them
+        connections.close_all()
+
+# ================== QUEUE OPERATIONS ==================
+def enqueue_answer_evaluation(candidate, interview_id, question_index, question, answer, mode, role="", designation=""):
+    """Persist an evaluation job for a submitted answer and schedule it on the local pool."""
+    # A resubmitted answer replaces the earlier job (plain statements, no long-held row locks)
+    AnswerEvaluationJob.objects.filter(interview_id=interview_id, question_index=question_index).delete()
+    job = AnswerEvaluationJob.objects.create(
+        candidate=candidate,
+        interview_id=interview_id,
+        question_index=question_index,
+        question=question,
+        answer=answer or "",
+        mode=mode,
+        role=role or "",
+        designation=designation or ""
+    )
+    transaction.on_commit(lambda: _get_executor().submit(_run_job_in_thread, job.pk))
+    return job
+
+def claim_job(job_id):
+    """Atomically move a pending job to running; returns the job or None if someone else has it."""
+    claimed = AnswerEvaluationJob.objects.filter(pk=job_id, status="pending").update(
+        status="running",
+        started_at=timezone.now(),
+        attempts=F("attempts") + 1
+    )
+    if not claimed:
+        return None
+    return AnswerEvaluationJob.objects.get(pk=job_id)
+
+def run_job(job_id):
+    """Claim and evaluate a single job, storing the result on the row."""
+    job = claim_job(job_id)
+    if job is None:
+        return None
+
+    try:
+        job.result = evaluate_answer(
+            job.question,
+            job.answer,
+            role=job.role,
+            designation=job.designation,
+            mode=job.mode
+        )
+        job.status = "done"
+    except Exception as e:
+        print(f"Evaluation job {job_id} failed: {e}")
+        job.status = "failed"
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=["result", "status", "finished_at"])
+    return job
+
+def _evaluate_inline(jobs, deadline):
+    """Evaluate jobs in the calling thread in one go (batched when enabled)."""
+    if not jobs:
+        return {}
+    results = evaluate_interview_answers(
+        [{"question": job.question, "answer": job.answer, "mode": job.mode} for job in jobs],
+        role=jobs[0].role,
+        designation=jobs[0].designation,
+        deadline=deadline
+    )
+    return {job.question_index: result for job, result in zip(jobs, results)}
+
+def collect_interview_evaluations(interview_id, timeout=None, poll_interval=0.25, deadline=None):
+    """
+    Gather finished evaluations for an interview, waiting on stragglers.
+
+    Pending jobs that no worker has started are claimed and run inline
+    straight away; running jobs are waited on until ``timeout`` seconds,
+    after which they are re-evaluated inline together with any failed jobs.
+
+    Inline Gemini calls share ``deadline`` (the caller's request budget).
+
+    Returns:
+        dict: question_index -> evaluation result
+    """
+    if deadline is None:
+        deadline = get_evaluation_deadline()
+    if timeout is None:
+        timeout = getattr(settings, "AI_EVALUATION_COLLECT_TIMEOUT", 30)
+    wait_until = time.monotonic() + timeout
+
+    # Anything not yet picked up is cheaper to run here than to wait for
+    pending_ids = AnswerEvaluationJob.objects.filter(
+        interview_id=interview_id, status="pending"
+    ).values_list("pk", flat=True)
+    claimed = [job for job in (claim_job(job_id) for job_id in list(pending_ids)) if job is not None]
+    results = _evaluate_inline(claimed, deadline)
+
+    while True:
+        jobs = [job for job in AnswerEvaluationJob.objects.filter(interview_id=interview_id)
+                if job.question_index not in results]
+        if all(job.status in ("done", "failed") for job in jobs) or time.monotonic() >= wait_until:
+            break
+        time.sleep(poll_interval)
+
+    for job in jobs:
+        if job.status == "done" and job.result:
+            results[job.question_index] = job.result
+
+    # Failed jobs and ones still running past the wait timeout
+    results.update(_evaluate_inline([job for job in jobs if job.question_index not in results], deadline))
+
+    # Results are persisted on the InterviewRecord; the queue rows are no longer needed
+    AnswerEvaluationJob.objects.filter(interview_id=interview_id).delete()
+    return results
+
+def process_pending_jobs(older_than_seconds=0, stale_after_seconds=300, purge_after_seconds=86400, limit=None):
+    """Run pending jobs left behind by restarted workers. Returns the number processed."""
+    now = timezone.now()
+
+    # Jobs of interviews that were abandoned before interview_complete
+    AnswerEvaluationJob.objects.filter(
+        created_at__lte=now - timedelta(seconds=purge_after_seconds)
+    ).delete()
+
+    # A job stuck in "running" this long lost its worker; put it back in the queue
+    AnswerEvaluationJob.objects.filter(
+        status="running", started_at__lte=now - timedelta(seconds=stale_after_seconds)
+    ).update(status="pending")
+
+    cutoff = now - timedelta(seconds=older_than_seconds)
+    job_ids = AnswerEvaluationJob.objects.filter(
+        status="pending", created_at__lte=cutoff
+    ).order_by("created_at").values_list("pk", flat=True)
+    if limit:
+        job_ids = job_ids[:limit]
+
+    processed = 0
+    for job_id in list(job_ids):
+        if run_job(job_id) is not None:
+            processed += 1
+    return processed
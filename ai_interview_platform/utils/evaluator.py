@@ -1,19 +1,16 @@
 # Enhanced AI Interview Answer Evaluator
-import os
 import json
 import re
-import google.generativeai as genai
-from dotenv import load_dotenv
-
-load_dotenv()
-api_key = os.getenv("GEMINI_API_KEY_1")
-if not api_key:
-    raise ValueError("GEMINI_API_KEY not found.")
-
-genai.configure(api_key=api_key)
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connections
+from ai_interview_platform.utils.evaluation_cache import make_cache_key, get_cached_evaluation, store_evaluation
+from ai_interview_platform.utils.gemini_client import generate_content, Deadline, GeminiUnavailable
 
 # Use a simpler model configuration for better reliability
-model = genai.GenerativeModel("gemini-1.5-pro-latest")
+EVALUATION_MODEL_NAME = "gemini-1.5-pro-latest"
 
 # Enhanced evaluation criteria with detailed descriptions
 EVALUATION_CRITERIA = {
@@ -96,6 +93,50 @@ IMPORTANT: Return ONLY valid JSON in this exact format:
 Do not include any other text, only the JSON response.
 """
 
+BATCH_EVALUATION_PROMPT = """
+You are an expert HR evaluator conducting technical and behavioral interviews.
+
+EVALUATE each of the candidate's answers below based on the following criteria (1-5 stars each):
+
+{criteria_text}
+
+ROLE: {role}
+DESIGNATION: {designation}
+
+{answers_text}
+
+EVALUATION INSTRUCTIONS:
+1. Evaluate every answer independently, rating each criterion from 1-5 based on the descriptions provided
+2. Consider the role context: {role} - {designation}
+3. For audio answers, evaluate based on transcribed content
+4. Be fair but thorough in assessment
+5. Provide specific, actionable feedback
+
+IMPORTANT: Return ONLY a valid JSON array with exactly {count} objects, one per answer, in this exact format:
+[
+  {{
+    "Index": <answer number>,
+    "Relevance and Clarity": <number 1-5>,
+    "Technical Knowledge": <number 1-5>,
+    "Communication Skills": <number 1-5>,
+    "Problem-Solving Approach": <number 1-5>,
+    "Experience and Examples": <number 1-5>,
+    "Overall Score": <number 1-5>,
+    "Strengths": ["strength1", "strength2"],
+    "Areas for Improvement": ["improvement1", "improvement2"],
+    "Detailed Feedback": "comprehensive feedback explaining the evaluation",
+    "Recommendation": "brief recommendation for this candidate"
+  }}
+]
+
+Do not include any other text, only the JSON array.
+"""
+
+# Changes to the rubric or prompts invalidate cached evaluations
+RUBRIC_VERSION = hashlib.sha256(
+    (json.dumps(EVALUATION_CRITERIA, sort_keys=True) + ENHANCED_EVALUATION_PROMPT + BATCH_EVALUATION_PROMPT).encode("utf-8")
+).hexdigest()[:16]
+
 def clean_answer_text(answer):
     """Clean and normalize answer text for evaluation."""
     if not answer or answer.strip() == "":
@@ -168,7 +209,70 @@ def extract_json_from_response(response_text):
     except:
         return None
 
-def evaluate_answer(question, answer, role="", designation="", mode="text"):
+def extract_json_array_from_response(response_text):
+    """Extract a JSON array from a batched AI response."""
+    try:
+        json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
+        if json_match:
+            parsed = json.loads(json_match.group())
+            if isinstance(parsed, list):
+                return parsed
+    except:
+        pass
+
+    try:
+        parsed = json.loads(response_text.strip())
+        return parsed if isinstance(parsed, list) else None
+    except:
+        return None
+
+def normalize_evaluation(evaluation):
+    """Validate an AI evaluation dict and normalize it to the standard shape."""
+    if not evaluation or not isinstance(evaluation, dict):
+        return None
+
+    # Validate and normalize scores
+    validated_evaluation = {}
+    for criterion in EVALUATION_CRITERIA.keys():
+        score = evaluation.get(criterion, 1)
+        if isinstance(score, (int, float)) and 1 <= score <= 5:
+            validated_evaluation[criterion] = int(score)
+        else:
+            validated_evaluation[criterion] = 1
+
+    # Calculate overall score
+    scores = [validated_evaluation[criterion] for criterion in EVALUATION_CRITERIA.keys()]
+    overall_score = sum(scores) / len(scores)
+    validated_evaluation["Overall Score"] = round(overall_score, 1)
+
+    # Ensure other fields exist
+    validated_evaluation["Strengths"] = evaluation.get("Strengths", [])
+    validated_evaluation["Areas for Improvement"] = evaluation.get("Areas for Improvement", [])
+    validated_evaluation["Detailed Feedback"] = evaluation.get("Detailed Feedback", "Evaluation completed")
+    validated_evaluation["Recommendation"] = evaluation.get("Recommendation", "Standard evaluation")
+
+    return validated_evaluation
+
+def invalid_answer_evaluation(validation_message):
+    """Lowest-score evaluation for answers that cannot be assessed."""
+    return {
+        "Relevance and Clarity": 1,
+        "Technical Knowledge": 1,
+        "Communication Skills": 1,
+        "Problem-Solving Approach": 1,
+        "Experience and Examples": 1,
+        "Overall Score": 1,
+        "Strengths": [],
+        "Areas for Improvement": [validation_message],
+        "Detailed Feedback": f"Unable to evaluate: {validation_message}",
+        "Recommendation": "Candidate should provide more detailed answers"
+    }
+
+def get_evaluation_deadline():
+    """Fresh time budget for the Gemini calls of one evaluation request."""
+    return Deadline(getattr(settings, "GEMINI_EVALUATION_DEADLINE_SECONDS", 45))
+
+def evaluate_answer(question, answer, role="", designation="", mode="text", deadline=None):
     """
     Enhanced evaluation of candidate answers using AI.
     
@@ -178,6 +282,7 @@ def evaluate_answer(question, answer, role="", designation="", mode="text"):
         role (str): Role context (IT/Non-IT)
         designation (str): Specific designation
         mode (str): Answer mode ("text" or "voice")
+        deadline (Deadline): Shared time budget (defaults to a fresh one)
     
     Returns:
         dict: Comprehensive evaluation results
@@ -188,18 +293,12 @@ def evaluate_answer(question, answer, role="", designation="", mode="text"):
     is_valid, validation_message = detect_answer_quality(cleaned_answer)
     
     if not is_valid:
-        return {
-            "Relevance and Clarity": 1,
-            "Technical Knowledge": 1,
-            "Communication Skills": 1,
-            "Problem-Solving Approach": 1,
-            "Experience and Examples": 1,
-            "Overall Score": 1,
-            "Strengths": [],
-            "Areas for Improvement": [validation_message],
-            "Detailed Feedback": f"Unable to evaluate: {validation_message}",
-            "Recommendation": "Candidate should provide more detailed answers"
-        }
+        return invalid_answer_evaluation(validation_message)
+
+    cache_key = make_cache_key(question, cleaned_answer, role, designation, mode, RUBRIC_VERSION)
+    cached = get_cached_evaluation(cache_key)
+    if cached:
+        return cached
     
     try:
         # Build enhanced prompt
@@ -213,43 +312,32 @@ def evaluate_answer(question, answer, role="", designation="", mode="text"):
             designation=designation or "Role"
         )
         
-        # Generate evaluation with retry logic
+        if deadline is None:
+            deadline = get_evaluation_deadline()
+
+        # Generate evaluation with retry logic and exponential backoff
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                response = model.generate_content(prompt)
+                response = generate_content(prompt, EVALUATION_MODEL_NAME, deadline=deadline)
                 response_text = response.text.strip()
                 
                 # Extract JSON from response
-                evaluation = extract_json_from_response(response_text)
+                evaluation = normalize_evaluation(extract_json_from_response(response_text))
                 
-                if evaluation and isinstance(evaluation, dict):
-                    # Validate and normalize scores
-                    validated_evaluation = {}
-                    for criterion in EVALUATION_CRITERIA.keys():
-                        score = evaluation.get(criterion, 1)
-                        if isinstance(score, (int, float)) and 1 <= score <= 5:
-                            validated_evaluation[criterion] = int(score)
-                        else:
-                            validated_evaluation[criterion] = 1
-                    
-                    # Calculate overall score
-                    scores = [validated_evaluation[criterion] for criterion in EVALUATION_CRITERIA.keys()]
-                    overall_score = sum(scores) / len(scores)
-                    validated_evaluation["Overall Score"] = round(overall_score, 1)
-                    
-                    # Ensure other fields exist
-                    validated_evaluation["Strengths"] = evaluation.get("Strengths", [])
-                    validated_evaluation["Areas for Improvement"] = evaluation.get("Areas for Improvement", [])
-                    validated_evaluation["Detailed Feedback"] = evaluation.get("Detailed Feedback", "Evaluation completed")
-                    validated_evaluation["Recommendation"] = evaluation.get("Recommendation", "Standard evaluation")
-                    
-                    return validated_evaluation
+                if evaluation:
+                    store_evaluation(cache_key, evaluation)
+                    return evaluation
                 
+            except GeminiUnavailable as e:
+                # Breaker open or budget spent: retrying cannot help
+                print(f"Gemini unavailable, using manual evaluation: {e}")
+                break
             except Exception as e:
                 print(f"Attempt {attempt + 1} failed: {e}")
                 if attempt == max_retries - 1:
                     raise e
+                time.sleep(min(0.5 * (2 ** attempt), deadline.remaining()))
                 continue
         
         # If all retries failed, return manual evaluation
@@ -260,6 +348,149 @@ def evaluate_answer(question, answer, role="", designation="", mode="text"):
         # Return manual evaluation for failed cases
         return manual_evaluate_answer(question, cleaned_answer, role, designation)
 
+def evaluate_answers_concurrently(items, role="", designation="", max_workers=None, deadline=None):
+    """
+    Evaluate all answers of an interview in parallel.
+
+    Args:
+        items (list): Dicts with "question", "answer" and "mode" keys
+        role (str): Role context (IT/Non-IT)
+        designation (str): Specific designation
+        max_workers (int): Concurrency cap (defaults to AI_EVALUATION_MAX_WORKERS)
+        deadline (Deadline): Time budget shared by all answers
+
+    Returns:
+        list: Evaluation results in the same order as ``items``
+    """
+    if not items:
+        return []
+
+    if max_workers is None:
+        max_workers = getattr(settings, "AI_EVALUATION_MAX_WORKERS", 5)
+    max_workers = max(1, min(int(max_workers), len(items)))
+
+    def _evaluate(item):
+        return evaluate_answer(
+            item["question"],
+            item["answer"],
+            role=role,
+            designation=designation,
+            mode=item.get("mode", "text"),
+            deadline=deadline
+        )
+
+    def _evaluate_in_thread(item):
+        try:
+            return _evaluate(item)
+        finally:
+            # The evaluation cache opens a DB connection per worker thread
+            connections.close_all()
+
+    if max_workers == 1:
+        return [_evaluate(item) for item in items]
+
+    # executor.map yields results in submission order, so question order is preserved
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="answer-eval") as executor:
+        return list(executor.map(_evaluate_in_thread, items))
+
+def evaluate_answers_batch(items, role="", designation="", deadline=None):
+    """
+    Evaluate all answers of an interview with a single Gemini request.
+
+    The rubric is sent once for the whole interview. Answers whose batch
+    result is missing or fails validation are re-evaluated individually.
+
+    Args:
+        items (list): Dicts with "question", "answer" and "mode" keys
+        role (str): Role context (IT/Non-IT)
+        designation (str): Specific designation
+        deadline (Deadline): Time budget shared with the per-answer fallback
+
+    Returns:
+        list: Evaluation results in the same order as ``items``
+    """
+    if deadline is None:
+        deadline = get_evaluation_deadline()
+    results = [None] * len(items)
+
+    # Answers that fail local validation or are already cached never reach the model
+    pending = []
+    for position, item in enumerate(items):
+        cleaned_answer = clean_answer_text(item["answer"])
+        is_valid, validation_message = detect_answer_quality(cleaned_answer)
+        if not is_valid:
+            results[position] = invalid_answer_evaluation(validation_message)
+            continue
+
+        cache_key = make_cache_key(item["question"], cleaned_answer, role, designation, item.get("mode", "text"), RUBRIC_VERSION)
+        cached = get_cached_evaluation(cache_key)
+        if cached:
+            results[position] = cached
+        else:
+            pending.append((position, item, cleaned_answer, cache_key))
+
+    if len(pending) > 1:
+        answers_text = ""
+        for number, (_, item, cleaned_answer, _) in enumerate(pending, start=1):
+            answers_text += f"ANSWER {number}\n"
+            answers_text += f"QUESTION: \"{item['question'].strip()}\"\n"
+            answers_text += f"CANDIDATE ANSWER: \"{cleaned_answer}\"\n"
+            answers_text += f"ANSWER MODE: {item.get('mode', 'text')}\n\n"
+
+        prompt = BATCH_EVALUATION_PROMPT.format(
+            criteria_text=build_criteria_text(),
+            role=role or "Professional",
+            designation=designation or "Role",
+            answers_text=answers_text,
+            count=len(pending)
+        )
+
+        try:
+            response = generate_content(prompt, EVALUATION_MODEL_NAME, deadline=deadline)
+            batch = extract_json_array_from_response(response.text.strip()) or []
+
+            # Only accept an answer's result when it is unambiguously indexed
+            by_index = {}
+            for entry in batch:
+                if isinstance(entry, dict) and isinstance(entry.get("Index"), int):
+                    by_index.setdefault(entry["Index"], entry)
+
+            for number, (position, _, _, cache_key) in enumerate(pending, start=1):
+                evaluation = normalize_evaluation(by_index.get(number))
+                if evaluation:
+                    store_evaluation(cache_key, evaluation)
+                    results[position] = evaluation
+        except Exception as e:
+            print(f"Batch evaluation failed: {e}")
+
+    # Fall back to per-answer calls for anything the batch did not cover
+    missing = [position for position in range(len(items)) if results[position] is None]
+    if missing:
+        fallback = evaluate_answers_concurrently(
+            [items[position] for position in missing],
+            role=role,
+            designation=designation,
+            deadline=deadline
+        )
+        for position, result in zip(missing, fallback):
+            results[position] = result
+
+    return results
+
+def evaluate_interview_answers(items, role="", designation="", deadline=None):
+    """
+    Evaluate all answers of an interview using the configured strategy.
+
+    Uses a single batched request when AI_EVALUATION_BATCH is enabled,
+    otherwise concurrent per-answer requests. All Gemini calls share one
+    deadline, after which answers fall back to manual evaluation.
+    """
+    if deadline is None:
+        deadline = get_evaluation_deadline()
+    if getattr(settings, "AI_EVALUATION_BATCH", True):
+        return evaluate_answers_batch(items, role=role, designation=designation, deadline=deadline)
+    return evaluate_answers_concurrently(items, role=role, designation=designation, deadline=deadline)
+
 def manual_evaluate_answer(question, answer, role, designation):
     """Manual evaluation fallback when AI fails."""
     # Basic scoring based on answer length and content
@@ -0,0 +1,189 @@
+# Shared, lazily initialised Gemini client
+import os
+import time
+import threading
+
+# Optional Gemini import
+try:
+    import google.generativeai as genai  # type: ignore
+except Exception:
+    genai = None
+
+DEFAULT_MODEL_NAME = "gemini-1.5-pro-latest"
+
+# ================== PROCESS-WIDE MODEL REGISTRY ==================
+# Nothing here runs at import time: the API key is read and the SDK configured
+# on the first call that actually needs a model, and model objects are reused.
+
+_lock = threading.Lock()
+_configured = None  # None = not attempted yet, then True/False
+_models = {}
+
+def _get_api_key():
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except Exception:
+        pass
+    return os.getenv("GEMINI_API_KEY_1") or os.getenv("GEMINI_API_KEY")
+
+def _configure():
+    global _configured
+    if _configured is None:
+        with _lock:
+            if _configured is None:
+                api_key = _get_api_key()
+                if api_key and genai is not None:
+                    try:
+                        genai.configure(api_key=api_key)
+                        _configured = True
+                    except Exception as e:
+                        print(f"Gemini configuration failed: {e}")
+                        _configured = False
+                else:
+                    _configured = False
+    return _configured
+
+def is_gemini_enabled():
+    """Whether a Gemini API key and SDK are available in this process."""
+    return _configure()
+
+class GeminiUnavailable(RuntimeError):
+    """Gemini cannot be called right now; callers should use their local fallback."""
+
+class CircuitOpenError(GeminiUnavailable):
+    """The circuit breaker is open after repeated provider failures."""
+
+class DeadlineExceeded(GeminiUnavailable):
+    """The request's time budget for Gemini calls is used up."""
+
+def get_model(model_name=DEFAULT_MODEL_NAME, generation_config=None):
+    """
+    Return a shared GenerativeModel for the given name and generation config.
+
+    Raises:
+        GeminiUnavailable: If Gemini is not configured (missing SDK or API key)
+    """
+    if not _configure():
+        raise GeminiUnavailable("Gemini is not configured: GEMINI_API_KEY_1 / GEMINI_API_KEY not found.")
+
+    key = (model_name, tuple(sorted((generation_config or {}).items())))
+    model = _models.get(key)
+    if model is None:
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                if generation_config:
+                    model = genai.GenerativeModel(model_name, generation_config=generation_config)
+                else:
+                    model = genai.GenerativeModel(model_name)
+                _models[key] = model
+    return model
+
+# ================== CIRCUIT BREAKER ==================
+class CircuitBreaker:
+    """
+    Process-wide breaker around Gemini calls.
+
+    Opens after ``failure_threshold`` consecutive failures. Once
+    ``reset_timeout`` seconds have passed a single half-open probe is let
+    through; its outcome closes the breaker again or re-opens it.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow_request(self):
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probe_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+_breaker = None
+
+def get_circuit_breaker():
+    """Return the breaker shared by every Gemini caller in this process."""
+    global _breaker
+    if _breaker is None:
+        with _lock:
+            if _breaker is None:
+                from django.conf import settings
+                _breaker = CircuitBreaker(
+                    failure_threshold=getattr(settings, "GEMINI_BREAKER_FAILURE_THRESHOLD", 5),
+                    reset_timeout=getattr(settings, "GEMINI_BREAKER_RESET_SECONDS", 60),
+                )
+    return _breaker
+
+# ================== DEADLINE BUDGET ==================
+class Deadline:
+    """Wall-clock budget shared by every Gemini call made while serving one request."""
+
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+def generate_content(prompt, model_name=DEFAULT_MODEL_NAME, generation_config=None, deadline=None):
+    """
+    Call Gemini through the shared circuit breaker, bounded by ``deadline``.
+
+    Raises:
+        GeminiUnavailable: Not configured, breaker open or deadline spent.
+            Callers should go straight to their local fallback.
+        Exception: Whatever the SDK raised for a failed call.
+    """
+    if deadline is not None and deadline.expired():
+        raise DeadlineExceeded("Gemini deadline exceeded")
+
+    model = get_model(model_name, generation_config)
+
+    breaker = get_circuit_breaker()
+    if not breaker.allow_request():
+        raise CircuitOpenError("Gemini circuit breaker is open")
+
+    request_options = {"timeout": deadline.remaining()} if deadline is not None else None
+    try:
+        response = model.generate_content(prompt, request_options=request_options)
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    return response
@@ -0,0 +1,153 @@
+# Near-duplicate detection for interview questions (shingling + MinHash + LSH)
+import re
+import zlib
+import random
+from functools import lru_cache
+
+# ================== SIGNATURE PARAMETERS ==================
+# 120 hash functions split into 20 LSH bands of 6 rows: pairs at Jaccard 0.7
+# collide in some band ~92% of the time, at 0.8 ~99.6%, at 0.4 only ~8%.
+# Signatures stored with a different length (an older scheme) are ignored
+# and recomputed.
+NUM_PERMUTATIONS = 120
+BANDS = 20
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+DEFAULT_THRESHOLD = 0.7
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed: signatures are stored in the DB and must match across processes
+_rng = random.Random(1729)
+_PERMUTATIONS = [
+    (_rng.randint(1, _MERSENNE_PRIME - 1), _rng.randint(0, _MERSENNE_PRIME - 1))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+# Words that carry no meaning about *what* is being asked
+STOP_WORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "at", "by",
+    "from", "as", "is", "are", "was", "were", "be", "been", "do", "does", "did",
+    "you", "your", "yours", "we", "us", "our", "i", "me", "my", "it", "its", "this",
+    "that", "these", "those", "what", "which", "how", "why", "when", "where", "who",
+    "can", "could", "would", "should", "will", "have", "has", "had", "please",
+    "tell", "describe", "explain", "share", "give", "walk", "through", "about",
+    "time", "example", "some", "any", "most", "role", "position",
+}
+
+# ================== SHINGLING ==================
+def _stem(word):
+    for suffix in ("ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+def _content_words(text):
+    return [_stem(w) for w in re.findall(r"[a-z0-9+#]+", (text or "").lower()) if w not in STOP_WORDS]
+
+def designation_words(designation):
+    """Content words of a designation, to leave out of shingling."""
+    return frozenset(_content_words(designation))
+
+def shingles(text, ignore_words=frozenset()):
+    """
+    Shingle set of a question: character trigrams of each content word.
+
+    Word-local trigrams survive reordering and small inflection changes,
+    which is how Gemini usually rephrases a question. ``ignore_words`` (the
+    designation's words, which most questions repeat) are left out unless
+    nothing else would remain.
+    """
+    words = _content_words(text)
+    if ignore_words:
+        words = [w for w in words if w not in ignore_words] or words
+    result = set()
+    for word in words:
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            result.add(padded[i:i + 3])
+    return result
+
+# ================== MINHASH ==================
+@lru_cache(maxsize=4096)
+def minhash_signature(text, ignore_words=frozenset()):
+    """MinHash signature (tuple of NUM_PERMUTATIONS ints) of a question."""
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles(text, ignore_words)]
+    if not hashes:
+        return tuple([_MAX_HASH] * NUM_PERMUTATIONS)
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    )
+
+def estimate_similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERMUTATIONS
+
+def _band_keys(signature):
+    return [
+        (band, tuple(signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]))
+        for band in range(BANDS)
+    ]
+
+# ================== INDEX ==================
+class NearDuplicateIndex:
+    """
+    LSH index over question signatures.
+
+    Lookups only compare against questions sharing at least one band, so
+    screening a question costs a handful of dict lookups regardless of how
+    long the candidate's history is.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, designation=""):
+        self.threshold = threshold
+        self.ignore_words = designation_words(designation)
+        self.questions = []
+        self._signatures = []
+        self._buckets = {}
+
+    def __len__(self):
+        return len(self.questions)
+
+    def add(self, question, signature=None):
+        """Add a question (optionally with a stored signature) to the index."""
+        if signature and len(signature) == NUM_PERMUTATIONS:
+            signature = tuple(signature)
+        else:
+            signature = minhash_signature(question, self.ignore_words)
+        position = len(self.questions)
+        self.questions.append(question)
+        self._signatures.append(signature)
+        for key in _band_keys(signature):
+            self._buckets.setdefault(key, []).append(position)
+
+    def find_duplicate(self, question):
+        """Return the indexed question ``question`` duplicates, or None."""
+        signature = minhash_signature(question, self.ignore_words)
+        candidates = set()
+        for key in _band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+        for position in candidates:
+            if estimate_similarity(signature, self._signatures[position]) >= self.threshold:
+                return self.questions[position]
+        return None
+
+    def is_duplicate(self, question):
+        return self.find_duplicate(question) is not None
+
+    def screen(self, questions):
+        """
+        Split questions into (accepted, rejected).
+
+        Accepted questions are added to the index as they pass, so two
+        rephrasings within the same batch are also caught.
+        """
+        accepted, rejected = [], []
+        for question in questions:
+            if self.is_duplicate(question):
+                rejected.append(question)
+            else:
+                accepted.append(question)
+                self.add(question)
+        return accepted, rejected
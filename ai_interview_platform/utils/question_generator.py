@@ -1,36 +1,23 @@
 # Enhanced AI Interview Question Generator
-import os
 import time
 import random
 import re
 import hashlib
+import threading
 from datetime import datetime
-from django.db.models import Count
-from candidate.models import InterviewRecord
-
-# Optional Gemini import
-try:
-    import google.generativeai as genai  # type: ignore
-except Exception:
-    genai = None
-
-# ================== LOAD & CONFIGURE GEMINI ==================
-
-GEMINI_ENABLED = False
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-    api_key = os.getenv("GEMINI_API_KEY")
-    if api_key and genai is not None:
-        try:
-            genai.configure(api_key=api_key)
-            GEMINI_ENABLED = True
-        except Exception:
-            GEMINI_ENABLED = False
-    else:
-        GEMINI_ENABLED = False
-except Exception:
-    GEMINI_ENABLED = False 
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count, F
+from candidate.models import AskedQuestion, QuestionBankEntry
+from ai_interview_platform.utils.gemini_client import generate_content, is_gemini_enabled, Deadline
+from ai_interview_platform.utils.near_duplicates import NearDuplicateIndex, minhash_signature, designation_words
+
+QUESTION_MODEL_NAME = "gemini-1.5-pro-latest"
+QUESTION_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "top_p": 0.9,
+    "max_output_tokens": 800,
+}
 
 # ================== DIFFICULTY PROGRESSION ==================
 def get_difficulty_by_interview_count(count: int) -> str:
@@ -111,33 +98,73 @@ def extract_questions(text, num_questions):
     return questions[:num_questions]
 
 # ================== PERSISTENT QUESTION HISTORY ==================
-def get_previous_questions_for_candidate(candidate_id, designation):
-    """Get questions previously asked to this candidate for this designation."""
+def question_hash(question):
+    """Stable hash of a question, insensitive to case and spacing."""
+    normalized = re.sub(r'\s+', ' ', (question or "").strip()).lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+def record_asked_questions(interview_record):
+    """Write the questions of a persisted interview to the indexed history table."""
+    AskedQuestion.objects.bulk_create([
+        AskedQuestion(
+            candidate_id=interview_record.candidate_id,
+            interview=interview_record,
+            designation=interview_record.designation,
+            question=item['question'],
+            question_hash=question_hash(item['question']),
+            minhash=list(minhash_signature(item['question'], designation_words(interview_record.designation))),
+            asked_at=interview_record.created_at,
+        )
+        for item in interview_record.evaluations
+        if item.get('question')
+    ])
+
+def get_candidate_question_index(candidate_id, designation):
+    """
+    Interview count and near-duplicate index of previously asked questions.
+
+    One indexed query over AskedQuestion, however many interviews exist.
+    The index keeps the questions most recent first in ``index.questions``.
+
+    Returns:
+        tuple: (interview_count, NearDuplicateIndex)
+    """
+    index = NearDuplicateIndex(designation=designation)
     try:
-        previous_interviews = InterviewRecord.objects.filter(
+        rows = AskedQuestion.objects.filter(
             candidate_id=candidate_id,
             designation=designation
-        ).order_by('-created_at')
-        
-        previous_questions = set()
-        for interview in previous_interviews:
-            for eval_item in interview.evaluations:
-                if 'question' in eval_item:
-                    previous_questions.add(eval_item['question'])
-        
-        return list(previous_questions)
+        ).order_by('-asked_at').values_list('interview_id', 'question', 'minhash')
+
+        interview_ids = set()
+        seen = set()
+        for interview_id, question, signature in rows:
+            interview_ids.add(interview_id)
+            if question not in seen:
+                seen.add(question)
+                # Rows backfilled before signatures existed (or from an older scheme) are hashed on the fly
+                index.add(question, signature)
+        return len(interview_ids), index
     except Exception:
-        return []
+        return 0, NearDuplicateIndex(designation=designation)
+
+def get_candidate_question_history(candidate_id, designation):
+    """
+    Interview count and previously asked questions for a candidate+designation.
+
+    Returns:
+        tuple: (interview_count, previous_questions)
+    """
+    interview_count, index = get_candidate_question_index(candidate_id, designation)
+    return interview_count, list(index.questions)
+
+def get_previous_questions_for_candidate(candidate_id, designation):
+    """Get questions previously asked to this candidate for this designation."""
+    return get_candidate_question_history(candidate_id, designation)[1]
 
 def get_interview_count_for_designation(candidate_id, designation):
     """Get how many times this candidate has been interviewed for this designation."""
-    try:
-        return InterviewRecord.objects.filter(
-            candidate_id=candidate_id,
-            designation=designation
-        ).count()
-    except Exception:
-        return 0
+    return get_candidate_question_history(candidate_id, designation)[0]
 
 # ================== ENHANCED FALLBACK QUESTIONS ==================
 def get_fallback_questions(role, designation, difficulty, num_questions):
@@ -198,41 +225,180 @@ def get_fallback_questions(role, designation, difficulty, num_questions):
     random.shuffle(available)
     return available[:num_questions]
 
+# ================== PRE-GENERATED QUESTION BANK ==================
+DIFFICULTY_LEVELS = ["very_easy", "easy", "medium"]
+
+def get_bank_questions(role, designation, difficulty, num_questions, previous_questions=(), index=None):
+    """
+    Serve questions from the bank, least-served first, skipping ones this candidate has seen.
+
+    With ``index`` (a NearDuplicateIndex of the candidate's history) rephrasings
+    of seen questions are skipped too.
+
+    Returns:
+        tuple: (questions, available) where ``available`` is how many unseen
+        questions the bank still holds for this candidate
+    """
+    seen = {question_hash(q) for q in previous_questions}
+    entries = [
+        entry for entry in QuestionBankEntry.objects.filter(
+            role=role, designation=designation, difficulty=difficulty
+        ).order_by('times_served', '?').only('id', 'question', 'question_hash')
+        if entry.question_hash not in seen
+    ]
+    if index is not None:
+        entries = [entry for entry in entries if not index.is_duplicate(entry.question)]
+
+    # Two rephrasings of one question can both sit in the bank
+    picked_index = NearDuplicateIndex(designation=designation)
+    picked = []
+    for entry in entries:
+        if len(picked) >= num_questions:
+            break
+        if picked_index.is_duplicate(entry.question):
+            continue
+        picked_index.add(entry.question)
+        picked.append(entry)
+    if len(picked) >= num_questions:
+        QuestionBankEntry.objects.filter(pk__in=[e.pk for e in picked]).update(times_served=F('times_served') + 1)
+    return [e.question for e in picked], len(entries)
+
+def add_to_question_bank(role, designation, difficulty, questions):
+    """Store questions in the bank; duplicates are ignored. Returns the number offered."""
+    entries = [
+        QuestionBankEntry(
+            role=role,
+            designation=designation,
+            difficulty=difficulty,
+            question=q,
+            question_hash=question_hash(q)
+        )
+        for q in questions
+    ]
+    QuestionBankEntry.objects.bulk_create(entries, ignore_conflicts=True)
+    return len(entries)
+
+def refill_question_bank(role, designation, difficulty, target=None, deadline=None):
+    """
+    Top the bank for one key up to ``target`` questions with Gemini.
+
+    Returns:
+        int: Number of questions added
+    """
+    if target is None:
+        target = getattr(settings, "QUESTION_BANK_TARGET", 30)
+    current = QuestionBankEntry.objects.filter(role=role, designation=designation, difficulty=difficulty).count()
+    needed = min(target - current, 15)  # Keep each request within max_output_tokens
+    if needed <= 0 or not is_gemini_enabled():
+        return 0
+
+    if deadline is None:
+        deadline = Deadline(getattr(settings, "GEMINI_QUESTION_DEADLINE_SECONDS", 20))
+    existing = list(QuestionBankEntry.objects.filter(
+        role=role, designation=designation, difficulty=difficulty
+    ).values_list('question', flat=True))
+    prompt = build_enhanced_prompt(role, designation, difficulty, needed, existing)
+    response = generate_content(prompt, QUESTION_MODEL_NAME, QUESTION_GENERATION_CONFIG, deadline=deadline)
+    questions = extract_questions(response.text, needed)
+    add_to_question_bank(role, designation, difficulty, questions)
+
+    return QuestionBankEntry.objects.filter(role=role, designation=designation, difficulty=difficulty).count() - current
+
+_refills_in_flight = set()
+_refills_lock = threading.Lock()
+
+def schedule_question_bank_refill(role, designation, difficulty):
+    """Refill the bank for one key on a background thread (at most one refill per key at a time)."""
+    key = (role, designation, difficulty)
+    with _refills_lock:
+        if key in _refills_in_flight:
+            return
+        _refills_in_flight.add(key)
+
+    def _refill():
+        try:
+            refill_question_bank(role, designation, difficulty)
+        except Exception as e:
+            print(f"Question bank refill failed for {key}: {e}")
+        finally:
+            with _refills_lock:
+                _refills_in_flight.discard(key)
+            connections.close_all()
+
+    threading.Thread(target=_refill, name="question-bank-refill", daemon=True).start()
+
 # ================== MAIN ENHANCED GENERATOR ==================
-def generate_questions(role, designation, num_questions=5, candidate_id=None):
+def generate_questions(role, designation, num_questions=5, candidate_id=None, deadline=None):
     """
     Enhanced question generator with persistent history and role-specific accuracy.
+
+    Questions are served from the pre-generated bank when it holds enough
+    unseen questions for this candidate. A refill is scheduled once the bank
+    runs below QUESTION_BANK_LOW_WATER, and live generation is only used when
+    the bank cannot cover the interview.
+
+    Gemini calls are bounded by ``deadline`` (defaults to
+    GEMINI_QUESTION_DEADLINE_SECONDS) and skipped while the shared circuit
+    breaker is open, in which case fallback questions are served.
+
+    Generated questions that are rephrasings of ones the candidate has
+    already been asked are rejected by the near-duplicate index, and exactly
+    that many replacements are requested in one follow-up call.
     """
     if not role or not designation:
         return ["Error: Role and designation required."]
     
     # Get candidate's interview history for this designation
-    interview_count = get_interview_count_for_designation(candidate_id, designation) if candidate_id else 0
-    previous_questions = get_previous_questions_for_candidate(candidate_id, designation) if candidate_id else []
+    interview_count, history_index = get_candidate_question_index(candidate_id, designation) if candidate_id else (0, NearDuplicateIndex(designation=designation))
+    previous_questions = list(history_index.questions)
     
     # Determine difficulty based on interview count
     difficulty = get_difficulty_by_interview_count(interview_count)
+
+    # Serve from the pre-generated bank when possible
+    try:
+        bank_questions, available = get_bank_questions(
+            role, designation, difficulty, num_questions, previous_questions, index=history_index
+        )
+        if available < getattr(settings, "QUESTION_BANK_LOW_WATER", 10) and is_gemini_enabled():
+            schedule_question_bank_refill(role, designation, difficulty)
+        if len(bank_questions) >= num_questions:
+            return bank_questions
+    except Exception as e:
+        print(f"Question bank lookup failed: {e}")
     
-    # Try AI generation first
-    if GEMINI_ENABLED:
+    # Fall back to live AI generation
+    if is_gemini_enabled():
         try:
             prompt = build_enhanced_prompt(role, designation, difficulty, num_questions, previous_questions)
             
-            # Use Gemini Pro for better question quality
-            model = genai.GenerativeModel(
-                "gemini-1.5-pro-latest",
-                generation_config={
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "max_output_tokens": 800,
-                }
-            )
-            
-            response = model.generate_content(prompt)
+            if deadline is None:
+                deadline = Deadline(getattr(settings, "GEMINI_QUESTION_DEADLINE_SECONDS", 20))
+
+            # Use Gemini Pro for better question quality (shared model instance)
+            response = generate_content(prompt, QUESTION_MODEL_NAME, QUESTION_GENERATION_CONFIG, deadline=deadline)
             ai_questions = extract_questions(response.text, num_questions)
             
-            # Filter out previously asked questions
-            new_questions = [q for q in ai_questions if q not in previous_questions]
+            # Filter out previously asked questions, including rephrasings
+            new_questions, rejected = history_index.screen(ai_questions)
+
+            # Ask once more for exactly as many questions as were rejected
+            if rejected and not deadline.expired():
+                try:
+                    retry_prompt = build_enhanced_prompt(
+                        role, designation, difficulty, len(rejected), rejected + previous_questions
+                    )
+                    response = generate_content(retry_prompt, QUESTION_MODEL_NAME, QUESTION_GENERATION_CONFIG, deadline=deadline)
+                    replacements, _ = history_index.screen(extract_questions(response.text, len(rejected)))
+                    new_questions += replacements
+                except Exception as e:
+                    print(f"Replacement question generation failed: {e}")
+
+            # Live questions are good bank material too
+            try:
+                add_to_question_bank(role, designation, difficulty, new_questions)
+            except Exception as e:
+                print(f"Could not bank generated questions: {e}")
             
             if len(new_questions) >= num_questions:
                 return new_questions[:num_questions]
@@ -240,7 +406,7 @@ def generate_questions(role, designation, num_questions=5, candidate_id=None):
                 # Supplement with fallback questions
                 remaining = num_questions - len(new_questions)
                 fallback = get_fallback_questions(role, designation, difficulty, remaining)
-                fallback = [q for q in fallback if q not in previous_questions and q not in new_questions]
+                fallback = [q for q in fallback if not history_index.is_duplicate(q)]
                 combined = new_questions + fallback[:remaining]
                 # If still short, pad with generic templates
                 if len(combined) < num_questions:
@@ -0,0 +1,60 @@
+# Persistent cache of resume parse results, keyed by the uploaded file's SHA-256
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+from candidate.models import ResumeParseCacheEntry
+from ai_interview_platform.utils.resume_utils import RESUME_PARSER_VERSION
+
+def get_cached_parse(content_hash):
+    """
+    Return the cached parse result for a file hash, or None.
+
+    The result has the same shape as parse_resume_and_detect_field() minus
+    ``raw_text``, which is never stored.
+    """
+    if not content_hash:
+        return None
+    try:
+        entry = ResumeParseCacheEntry.objects.filter(
+            content_hash=content_hash, parser_version=RESUME_PARSER_VERSION
+        ).first()
+        if entry is None:
+            return None
+
+        ResumeParseCacheEntry.objects.filter(pk=entry.pk).update(
+            hit_count=F("hit_count") + 1, last_used_at=timezone.now()
+        )
+        return {
+            "field": entry.field,
+            "skills": entry.skills,
+            "text_digest": entry.text_digest,
+            "pages_processed": entry.pages_processed,
+        }
+    except Exception as e:
+        # The cache must never break an upload
+        print(f"⚠️ Resume parse cache lookup failed: {e}")
+        return None
+
+def store_parse(content_hash, parsed):
+    """Cache a finished parse result for a file hash."""
+    if not content_hash:
+        return
+    values = {
+        "parser_version": RESUME_PARSER_VERSION,
+        "field": parsed.get("field") or "",
+        "skills": parsed.get("skills") or [],
+        "text_digest": parsed.get("text_digest") or "",
+        "pages_processed": parsed.get("pages_processed") or 0,
+    }
+    try:
+        refreshed = ResumeParseCacheEntry.objects.filter(content_hash=content_hash).update(
+            last_used_at=timezone.now(), **values
+        )
+        if not refreshed:
+            try:
+                ResumeParseCacheEntry.objects.create(content_hash=content_hash, **values)
+            except IntegrityError:
+                # The same file finished parsing twice at once
+                pass
+    except Exception as e:
+        print(f"⚠️ Resume parse cache store failed: {e}")
@@ -0,0 +1,172 @@
+# Resume parsing outside the request, in bounded child processes
+import os
+import threading
+import multiprocessing
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from candidate.models import CandidateProfile, ResumeParseJob
+from ai_interview_platform.utils.resume_utils import parse_resume_in_child, resume_parse_budgets
+from ai_interview_platform.utils.resume_cache import store_parse
+
+# ================== LOCAL WORKER POOL ==================
+# Each pool thread supervises one child process, so at most
+# RESUME_PARSE_WORKERS parses run at once per web process. A child that
+# overruns RESUME_PARSE_TIMEOUT is terminated; one that blows through
+# RESUME_PARSE_MEMORY_MB dies on its own. Neither can hold up the web worker.
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "RESUME_PARSE_WORKERS", 2),
+                    thread_name_prefix="resume-parse"
+                )
+    return _executor
+
+def _run_job_in_thread(job_id):
+    try:
+        run_job(job_id)
+    except Exception as e:
+        print(f"Resume parse job {job_id} crashed: {e}")
+    finally:
+        connections.close_all()
+
+# ================== APPLYING RESULTS ==================
+IT_DESIGNATION_HINTS = ["developer", "engineer", "programmer", "analyst", "architect", "administrator", "specialist", "consultant"]
+NON_IT_DESIGNATION_HINTS = ["hr", "sales", "marketing", "manager", "executive", "coordinator", "assistant", "writer", "recruiter", "accountant", "analyst"]
+
+def apply_parse_result(profile, parsed, current_designation):
+    """
+    Update the profile's field from a parse result, keeping the designation
+    only if it still fits the detected field.
+
+    Returns:
+        tuple: (message level, message) for the candidate
+    """
+    detected_field = parsed.get("field") or ""
+    if detected_field:
+        profile.field = detected_field
+    if current_designation and profile.field:
+        if profile.field == "IT" and any(tech in current_designation.lower() for tech in IT_DESIGNATION_HINTS):
+            profile.designation = current_designation
+        elif profile.field == "Non-IT" and any(non_tech in current_designation.lower() for non_tech in NON_IT_DESIGNATION_HINTS):
+            profile.designation = current_designation
+        else:
+            profile.designation = ""
+    else:
+        profile.designation = ""
+    profile.save()
+
+    if profile.field:
+        if profile.designation:
+            return "success", f"Resume parsed as {profile.field}. Your designation has been preserved."
+        return "success", f"Resume parsed as {profile.field}. Please select your designation."
+    return "warning", "Resume uploaded but could not detect IT/Non-IT. Please select manually."
+
+# ================== JOB OPERATIONS ==================
+def start_resume_parse(user, resume_path, previous_designation="", content_hash=""):
+    """Record a parse job for an uploaded resume and schedule it once the request commits."""
+    job = ResumeParseJob.objects.create(
+        user=user,
+        resume_path=resume_path,
+        previous_designation=previous_designation or "",
+        content_hash=content_hash or ""
+    )
+    transaction.on_commit(lambda: _get_executor().submit(_run_job_in_thread, job.pk))
+    return job
+
+def _parse_with_limits(resume_path):
+    """Run the parser in a child process. Returns (status, payload)."""
+    timeout = getattr(settings, "RESUME_PARSE_TIMEOUT", 30)
+    memory_mb = getattr(settings, "RESUME_PARSE_MEMORY_MB", 512)
+
+    # spawn: forking a threaded web worker with open DB connections is not safe
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=parse_resume_in_child,
+        args=(resume_path, resume_parse_budgets(), memory_mb, sender),
+        daemon=True
+    )
+    process.start()
+    sender.close()
+
+    try:
+        if receiver.poll(timeout):
+            return receiver.recv()
+        return "timeout", f"Resume parse took longer than {timeout}s"
+    except EOFError:
+        # Killed by the memory cap (or crashed) before reporting back
+        return "error", "Resume parser exited without a result"
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join(5)
+        receiver.close()
+
+def run_job(job_id):
+    """Claim a pending job, parse the resume and apply the result to the profile."""
+    claimed = ResumeParseJob.objects.filter(pk=job_id, status="pending").update(
+        status="running", started_at=timezone.now()
+    )
+    if not claimed:
+        return None
+    job = ResumeParseJob.objects.get(pk=job_id)
+
+    try:
+        status, payload = _parse_with_limits(job.resume_path)
+    finally:
+        try:
+            if os.path.exists(job.resume_path):
+                os.unlink(job.resume_path)
+        except Exception as e:
+            print(f"⚠️ Failed to delete temp file: {e}")
+
+    if status == "ok":
+        job.result = {key: value for key, value in payload.items() if key != "raw_text"}
+        store_parse(job.content_hash, payload)
+        try:
+            profile = CandidateProfile.objects.get(user_id=job.user_id)
+            job.message_level, job.message = apply_parse_result(profile, payload, job.previous_designation)
+            job.status = "done"
+        except Exception as e:
+            print(f"❌ Applying resume parse failed: {e}")
+            job.status = "failed"
+    else:
+        print(f"❌ Resume parsing failed: {payload}")
+        job.status = "timeout" if status == "timeout" else "failed"
+
+    if job.status != "done":
+        job.message_level = "warning"
+        job.message = "Resume uploaded, but parsing failed. Please select your designation manually."
+    job.finished_at = timezone.now()
+    job.save(update_fields=["result", "status", "message", "message_level", "finished_at"])
+    return job
+
+def expire_stale_job(job):
+    """Fail a job whose worker went away (restart, crash) so the upload page stops polling."""
+    if job.status not in ("pending", "running"):
+        return job
+    stale_after = getattr(settings, "RESUME_PARSE_TIMEOUT", 30) * 2 + 60
+    if job.created_at > timezone.now() - timedelta(seconds=stale_after):
+        return job
+
+    expired = ResumeParseJob.objects.filter(pk=job.pk, status__in=["pending", "running"]).update(
+        status="failed",
+        message_level="warning",
+        message="Resume uploaded, but parsing failed. Please select your designation manually.",
+        finished_at=timezone.now()
+    )
+    if expired:
+        if os.path.exists(job.resume_path):
+            os.unlink(job.resume_path)
+        job.refresh_from_db()
+    return job
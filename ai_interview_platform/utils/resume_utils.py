@@ -1,66 +1,354 @@
+# No module-level Django imports: the resume parse child process imports this
+# module, and it should not have to configure settings or load apps to do so
 import os
+import math
+import hashlib
+import time
+import zipfile
 import tempfile
 import requests
-from typing import Dict, Any, List
-from django.core.files.base import ContentFile
-from django.core.files.storage import default_storage
+from collections import deque
+from typing import Callable, Dict, Any, List, Optional
+
+
+# Bump when extraction or classification changes so cached parse results are not reused
+RESUME_PARSER_VERSION = "4"
+
+IT_KEYWORDS = [
+    "python", "java", "javascript", "react", "django", "flask", "api",
+    "sql", "database", "docker", "kubernetes", "aws", "azure",
+    "git", "github", "devops", "linux", "cloud", "node.js",
+    "html", "css", "c++", "c#", ".net", "spring", "microservices",
+    "machine learning", "data science", "tensorflow", "pytorch",
+]
+NON_IT_KEYWORDS = [
+    "hr", "recruiter", "talent acquisition", "payroll", "onboarding",
+    "sales", "business development", "marketing", "seo", "content",
+    "customer support", "operations", "accountant", "finance",
+    "teacher", "administration", "office assistant",
+]
+
+
+# Weight of a single keyword hit; generic words count for less than specific skills
+KEYWORD_WEIGHTS = {
+    "api": 0.5, "database": 0.5, "cloud": 0.5, "git": 0.75,
+    "content": 0.5, "operations": 0.5, "sales": 0.75, "finance": 0.75,
+    "administration": 0.5, "hr": 0.75,
+    "machine learning": 1.5, "data science": 1.5, "microservices": 1.5,
+    "talent acquisition": 1.5, "business development": 1.5, "customer support": 1.25,
+    "office assistant": 1.5,
+}
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed keyword list.
+
+    One left-to-right pass over the text finds every keyword occurrence.
+    Matches must sit on token boundaries wherever the keyword itself starts
+    or ends with a word character, so "hr" does not match "through" while
+    ".net" still matches "asp.net".
+    """
+
+    def __init__(self, keywords: List[str]):
+        self.keywords = list(keywords)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                if ch not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][ch] = len(self._goto) - 1
+                state = self._goto[state][ch]
+            self._output[state].append(index)
+
+        # Breadth-first failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Per-keyword hit counts in ``text`` (case-insensitive, boundary-aware)."""
+        text = text.lower()
+        counts: Dict[str, int] = {}
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for position, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in output[state]:
+                keyword = self.keywords[index]
+                start = position - len(keyword) + 1
+                if _is_word_char(keyword[0]) and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if _is_word_char(keyword[-1]) and position + 1 < len(text) and _is_word_char(text[position + 1]):
+                    continue
+                counts[keyword] = counts.get(keyword, 0) + 1
+        return counts
+
+
+# Compiled once per process
+_KEYWORD_AUTOMATON = KeywordAutomaton(IT_KEYWORDS + NON_IT_KEYWORDS)
+_IT_KEYWORD_SET = set(IT_KEYWORDS)
+
+
+def _weighted_score(hits: Dict[str, int]) -> float:
+    # Repeats add evidence with diminishing returns so one keyword cannot swamp the rest
+    return sum(KEYWORD_WEIGHTS.get(kw, 1.0) * (1 + math.log(count)) for kw, count in hits.items())
 
 
 def _simple_text_classification(text: str) -> Dict[str, Any]:
     """
     Very lightweight fallback classifier that:
     - extracts a rough list of "skills" as unique keywords
-    - classifies the profile as IT / Non-IT based on keyword hits
-    """
-    text_lower = text.lower()
-
-    it_keywords = [
-        "python", "java", "javascript", "react", "django", "flask", "api",
-        "sql", "database", "docker", "kubernetes", "aws", "azure",
-        "git", "github", "devops", "linux", "cloud", "node.js",
-        "html", "css", "c++", "c#", ".net", "spring", "microservices",
-        "machine learning", "data science", "tensorflow", "pytorch",
-    ]
-    non_it_keywords = [
-        "hr", "recruiter", "talent acquisition", "payroll", "onboarding",
-        "sales", "business development", "marketing", "seo", "content",
-        "customer support", "operations", "accountant", "finance",
-        "teacher", "administration", "office assistant",
-    ]
-
-    it_hits = sum(1 for kw in it_keywords if kw in text_lower)
-    non_it_hits = sum(1 for kw in non_it_keywords if kw in text_lower)
-
-    if it_hits == 0 and non_it_hits == 0:
+    - classifies the profile as IT / Non-IT based on weighted keyword hits
+    """
+    keyword_hits = _KEYWORD_AUTOMATON.count(text)
+    it_hits = {kw: n for kw, n in keyword_hits.items() if kw in _IT_KEYWORD_SET}
+    non_it_hits = {kw: n for kw, n in keyword_hits.items() if kw not in _IT_KEYWORD_SET}
+
+    if not keyword_hits:
         field = ""
-    elif it_hits >= non_it_hits:
+    elif _weighted_score(it_hits) >= _weighted_score(non_it_hits):
         field = "IT"
     else:
         field = "Non-IT"
 
     # Very rough "skills" list: top unique keywords that matched
-    skills: List[str] = []
-    for kw in it_keywords + non_it_keywords:
-        if kw in text_lower:
-            skills.append(kw)
+    skills: List[str] = [kw for kw in IT_KEYWORDS + NON_IT_KEYWORDS if kw in keyword_hits]
 
     return {
         "field": field,
         "skills": skills,
+        "keyword_hits": keyword_hits,
+    }
+
+
+class _ConfidenceTracker:
+    """
+    Accumulates distinct keyword hits page by page so extraction can stop
+    as soon as the IT / Non-IT decision is clear.
+    """
+
+    def __init__(self, confident_hits: int):
+        self.confident_hits = confident_hits
+        self.it_matched = set()
+        self.non_it_matched = set()
+
+    def __call__(self, page_text: str) -> bool:
+        for kw in _KEYWORD_AUTOMATON.count(page_text):
+            (self.it_matched if kw in _IT_KEYWORD_SET else self.non_it_matched).add(kw)
+        leading = max(len(self.it_matched), len(self.non_it_matched))
+        trailing = min(len(self.it_matched), len(self.non_it_matched))
+        return leading >= self.confident_hits and leading >= 2 * trailing
+
+
+def extract_pdf_text_streaming(
+    pdf_path: str,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    stop_when: Optional[Callable[[str], bool]] = None,
+) -> Dict[str, Any]:
+    """
+    Extract text page by page with pdfminer's layout generator.
+
+    Stops at the first of: end of document, ``max_pages`` pages,
+    ``max_chars`` characters, or ``stop_when(page_text)`` returning True.
+
+    Returns:
+        dict: text, pages_processed, stopped_reason ("end", "page_budget",
+        "char_budget" or "confident") and seconds spent
+    """
+    from pdfminer.high_level import extract_pages  # type: ignore
+    from pdfminer.layout import LTTextContainer  # type: ignore
+
+    started = time.monotonic()
+    parts: List[str] = []
+    chars = 0
+    pages_processed = 0
+    stopped_reason = "end"
+
+    for page_layout in extract_pages(pdf_path, maxpages=max_pages or 0):
+        page_text = "".join(
+            element.get_text() for element in page_layout if isinstance(element, LTTextContainer)
+        )
+        pages_processed += 1
+
+        if max_chars and chars + len(page_text) >= max_chars:
+            parts.append(page_text[:max_chars - chars])
+            stopped_reason = "char_budget"
+            break
+        parts.append(page_text)
+        chars += len(page_text)
+
+        if stop_when is not None and stop_when(page_text):
+            stopped_reason = "confident"
+            break
+        if max_pages and pages_processed >= max_pages:
+            stopped_reason = "page_budget"
+            break
+
+    return {
+        "text": "".join(parts),
+        "pages_processed": pages_processed,
+        "stopped_reason": stopped_reason,
+        "seconds": round(time.monotonic() - started, 3),
     }
 
 
-def parse_resume_and_detect_field(resume_path_or_url: str) -> Dict[str, Any]:
+# WordprocessingML elements that carry text or act as separators
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_DOCX_TEXT_TAG = _W_NS + "t"
+_DOCX_BREAK_TAGS = {_W_NS + "tab": "\t", _W_NS + "br": "\n", _W_NS + "cr": "\n"}
+_DOCX_PARAGRAPH_TAG = _W_NS + "p"
+# Check classification confidence every this many paragraphs
+_DOCX_PARAGRAPHS_PER_CHECK = 40
+
+
+def sniff_resume_format(path: str) -> str:
+    """
+    Detect the resume format from its leading bytes rather than its name.
+
+    Returns:
+        str: "pdf", "docx", "doc" (legacy Word, unsupported), "text" or "unknown"
+    """
+    with open(path, "rb") as f:
+        head = f.read(4096)
+
+    # The PDF header may be preceded by junk; readers accept it within the first KB
+    if b"%PDF-" in head[:1024]:
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        try:
+            with zipfile.ZipFile(path) as archive:
+                if "word/document.xml" in archive.namelist():
+                    return "docx"
+        except zipfile.BadZipFile:
+            pass
+        return "unknown"
+    if head.startswith(b"\xd0\xcf\x11\xe0"):
+        return "doc"
+    if head and b"\x00" not in head:
+        return "text"
+    return "unknown"
+
+
+def extract_docx_text_streaming(
+    docx_path: str,
+    max_chars: Optional[int] = None,
+    stop_when: Optional[Callable[[str], bool]] = None,
+) -> Dict[str, Any]:
+    """
+    Extract text from word/document.xml with an incremental XML parse.
+
+    Paragraphs are discarded as soon as their text is taken, so memory stays
+    flat however large the document is. Budgets and early stopping behave
+    like extract_pdf_text_streaming(); a DOCX counts as a single page.
+    """
+    from xml.etree.ElementTree import iterparse
+
+    started = time.monotonic()
+    parts: List[str] = []
+    pending: List[str] = []
+    chars = 0
+    paragraphs = 0
+    stopped_reason = "end"
+
+    with zipfile.ZipFile(docx_path) as archive, archive.open("word/document.xml") as document:
+        for _, element in iterparse(document, events=("end",)):
+            if element.tag == _DOCX_TEXT_TAG:
+                text = element.text or ""
+            elif element.tag in _DOCX_BREAK_TAGS:
+                text = _DOCX_BREAK_TAGS[element.tag]
+            elif element.tag == _DOCX_PARAGRAPH_TAG:
+                text = "\n"
+                paragraphs += 1
+                element.clear()
+            else:
+                continue
+
+            if max_chars and chars + len(text) >= max_chars:
+                parts.append(text[:max_chars - chars])
+                stopped_reason = "char_budget"
+                break
+            parts.append(text)
+            pending.append(text)
+            chars += len(text)
+
+            if stop_when is not None and element.tag == _DOCX_PARAGRAPH_TAG and paragraphs % _DOCX_PARAGRAPHS_PER_CHECK == 0:
+                if stop_when("".join(pending)):
+                    stopped_reason = "confident"
+                    break
+                pending = []
+
+    return {
+        "text": "".join(parts),
+        "pages_processed": 1,
+        "stopped_reason": stopped_reason,
+        "seconds": round(time.monotonic() - started, 3),
+    }
+
+
+def extract_plain_text(text_path: str, max_chars: Optional[int] = None) -> Dict[str, Any]:
+    """Read a plain-text resume up to ``max_chars`` characters."""
+    started = time.monotonic()
+    with open(text_path, "r", encoding="utf-8", errors="ignore") as f:
+        text = f.read(max_chars) if max_chars else f.read()
+        truncated = bool(max_chars) and bool(f.read(1))
+    return {
+        "text": text,
+        "pages_processed": 1,
+        "stopped_reason": "char_budget" if truncated else "end",
+        "seconds": round(time.monotonic() - started, 3),
+    }
+
+
+def resume_parse_budgets() -> Dict[str, int]:
+    """Read the extraction budgets from settings (in the caller's process)."""
+    from django.conf import settings
+    return {
+        "max_pages": getattr(settings, "RESUME_MAX_PAGES", 10),
+        "max_chars": getattr(settings, "RESUME_MAX_CHARS", 50000),
+        "confident_hits": getattr(settings, "RESUME_CONFIDENT_HITS", 8),
+    }
+
+
+def parse_resume_and_detect_field(resume_path_or_url: str, budgets: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
     """
     Best-effort resume parsing that is safe for deployment:
     - Accepts either a local file path or a Cloudinary URL
-    - Downloads from URL if needed, then uses pdfminer.six to extract plain text
+    - Downloads from URL if needed, detects PDF / DOCX / plain text from the
+      file's magic bytes and streams its text, stopping at the
+      RESUME_MAX_PAGES / RESUME_MAX_CHARS budget or once
+      RESUME_CONFIDENT_HITS distinct keywords have decided the field
     - Classifies IT / Non-IT based on keyword hits in the text
     - Avoids heavy spaCy/pyresparser dependencies that often fail on servers
+
+    The result also reports ``format``, ``pages_processed`` and ``extraction_seconds``.
+    ``budgets`` overrides resume_parse_budgets(); passing it keeps settings untouched.
     """
+    empty_result = {"field": "", "skills": [], "raw_text": "", "format": "", "pages_processed": 0, "extraction_seconds": 0.0}
     if not resume_path_or_url:
         print("⚠️ parse_resume_and_detect_field: resume_path_or_url is empty")
-        return {"field": "", "skills": [], "raw_text": ""}
+        return empty_result
 
     temp_file_path = None
     resume_path = resume_path_or_url
@@ -69,39 +357,56 @@ def parse_resume_and_detect_field(resume_path_or_url: str) -> Dict[str, Any]:
     if resume_path_or_url.startswith(('http://', 'https://')):
         try:
             print(f"📥 Downloading resume from URL: {resume_path_or_url[:50]}...")
-            response = requests.get(resume_path_or_url, timeout=30)
-            response.raise_for_status()
-            
-            # Create temporary file
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-            temp_file_path = temp_file.name
-            temp_file.write(response.content)
-            temp_file.close()
+            with requests.get(resume_path_or_url, timeout=30, stream=True) as response:
+                response.raise_for_status()
+
+                # Stream into a temporary file rather than buffering the whole body
+                with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
+                    temp_file_path = temp_file.name
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        temp_file.write(chunk)
             
             resume_path = temp_file_path
             print(f"✅ Resume downloaded to temp file: {temp_file_path}")
         except Exception as e:
             print(f"⚠️ Failed to download resume from URL: {e}")
-            return {"field": "", "skills": [], "raw_text": ""}
+            return empty_result
     elif not os.path.exists(resume_path):
         print(f"⚠️ parse_resume_and_detect_field: resume_path does not exist: {resume_path}")
-        return {"field": "", "skills": [], "raw_text": ""}
+        return empty_result
 
     raw_text = ""
+    resume_format = ""
+    pages_processed = 0
+    started = time.monotonic()
+    budgets = budgets or resume_parse_budgets()
+    max_chars = budgets["max_chars"]
+    tracker = _ConfidenceTracker(budgets["confident_hits"])
 
-    # Try pdfminer first
     try:
-        from pdfminer.high_level import extract_text  # type: ignore
-        raw_text = extract_text(resume_path) or ""
+        resume_format = sniff_resume_format(resume_path)
+        if resume_format == "pdf":
+            extracted = extract_pdf_text_streaming(
+                resume_path,
+                max_pages=budgets["max_pages"],
+                max_chars=max_chars,
+                stop_when=tracker,
+            )
+        elif resume_format == "docx":
+            extracted = extract_docx_text_streaming(resume_path, max_chars=max_chars, stop_when=tracker)
+        elif resume_format == "text":
+            extracted = extract_plain_text(resume_path, max_chars=max_chars)
+        else:
+            extracted = None
+            print(f"⚠️ Unsupported resume format: {resume_format}")
+
+        if extracted:
+            raw_text = extracted["text"]
+            pages_processed = extracted["pages_processed"]
+            print(f"📄 Extracted {resume_format} ({pages_processed} page(s)) in {extracted['seconds']}s ({extracted['stopped_reason']})")
     except Exception as e:
-        print(f"⚠️ pdfminer extract_text failed: {e}")
-        try:
-            # As a very last resort, read as plain text
-            with open(resume_path, "r", encoding="utf-8", errors="ignore") as f:
-                raw_text = f.read()
-        except Exception as e2:
-            print(f"⚠️ Fallback plain-text read failed: {e2}")
-            raw_text = ""
+        print(f"⚠️ {resume_format or 'Resume'} extraction failed: {e}")
+        raw_text = ""
     finally:
         # Clean up temporary file if we created one
         if temp_file_path and os.path.exists(temp_file_path):
@@ -117,6 +422,34 @@ def parse_resume_and_detect_field(resume_path_or_url: str) -> Dict[str, Any]:
     return {
         **classified,
         "raw_text": raw_text,
+        "text_digest": hashlib.sha256(raw_text.encode("utf-8")).hexdigest(),
+        "format": resume_format,
+        "pages_processed": pages_processed,
+        "extraction_seconds": round(time.monotonic() - started, 3),
     }
 
 
+def parse_resume_in_child(resume_path: str, budgets: Dict[str, int], memory_mb: int, conn) -> None:
+    """
+    Child-process entry point for parse_resume_and_detect_field.
+
+    Caps the process address space at ``memory_mb`` before parsing and sends
+    ("ok", parsed) or ("error", message) back over ``conn``. The parent reads
+    ``budgets`` from settings, so the spawned child imports only this module
+    and its plain-Python dependencies, never Django.
+    """
+    try:
+        if memory_mb:
+            try:
+                import resource
+                limit = memory_mb * 1024 * 1024
+                resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+            except (ImportError, ValueError, OSError) as e:
+                print(f"⚠️ Could not cap resume parser memory: {e}")
+        conn.send(("ok", parse_resume_and_detect_field(resume_path, budgets)))
+    except MemoryError:
+        conn.send(("error", f"Resume parse exceeded {memory_mb} MB"))
+    except Exception as e:
+        conn.send(("error", str(e)))
+    finally:
+        conn.close()
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from ai_interview_platform.utils.evaluation_queue import process_pending_jobs
+import time
+
+class Command(BaseCommand):
+    help = 'Run queued answer evaluations left behind by restarted web workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=60,
+                            help='Only pick up jobs pending for at least this many seconds')
+        parser.add_argument('--limit', type=int, default=None, help='Maximum jobs to run per pass')
+        parser.add_argument('--loop', type=int, default=0,
+                            help='Keep running, sleeping this many seconds between passes')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_pending_jobs(
+                older_than_seconds=options['older_than'],
+                limit=options['limit']
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f'Processed {processed} evaluation job(s)')
+            )
+            if not options['loop']:
+                return
+            time.sleep(options['loop'])
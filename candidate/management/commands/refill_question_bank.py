@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from candidate.forms import DesignationForm
+from ai_interview_platform.utils.question_generator import DIFFICULTY_LEVELS, refill_question_bank
+from ai_interview_platform.utils.gemini_client import is_gemini_enabled
+
+class Command(BaseCommand):
+    help = 'Pre-generate interview questions so interviews can start without a live Gemini call'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--role', choices=list(DesignationForm.DESIGNATION_CHOICES.keys()),
+                            help='Only refill this role (default: all)')
+        parser.add_argument('--designation', help='Only refill this designation')
+        parser.add_argument('--difficulty', choices=DIFFICULTY_LEVELS, help='Only refill this difficulty')
+        parser.add_argument('--target', type=int, default=None,
+                            help='Questions to keep per key (default: QUESTION_BANK_TARGET)')
+
+    def handle(self, *args, **options):
+        if not is_gemini_enabled():
+            self.stdout.write(self.style.ERROR('Gemini is not configured; nothing to do.'))
+            return
+
+        roles = [options['role']] if options['role'] else DesignationForm.DESIGNATION_CHOICES.keys()
+        difficulties = [options['difficulty']] if options['difficulty'] else DIFFICULTY_LEVELS
+
+        total = 0
+        for role in roles:
+            designations = [options['designation']] if options['designation'] else DesignationForm.DESIGNATION_CHOICES[role]
+            for designation in designations:
+                for difficulty in difficulties:
+                    try:
+                        added = refill_question_bank(role, designation, difficulty, target=options['target'])
+                    except Exception as e:
+                        self.stdout.write(self.style.WARNING(f'{role} / {designation} / {difficulty}: {e}'))
+                        continue
+                    total += added
+                    self.stdout.write(f'{role} / {designation} / {difficulty}: +{added}')
+
+        self.stdout.write(self.style.SUCCESS(f'Added {total} question(s) to the bank'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from ai_interview_platform.utils.email_service import drain_outbox, purge_outbox
+import time
+
+class Command(BaseCommand):
+    help = 'Send queued outbox emails, retrying failed sends with backoff, and purge old finished ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=20, help='Messages claimed per query')
+        parser.add_argument('--loop', type=int, default=0,
+                            help='Keep running, sleeping this many seconds between passes')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = drain_outbox(batch_size=options['batch_size'])
+            purged = purge_outbox()
+            self.stdout.write(
+                self.style.SUCCESS(f'Sent {sent} email(s), {failed} failed attempt(s), purged {purged} old row(s)')
+            )
+            if not options['loop']:
+                return
+            time.sleep(options['loop'])
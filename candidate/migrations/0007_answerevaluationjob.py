@@ -0,0 +1,40 @@
+# Generated by Django 4.2.23 on 2026-10-17 06:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('candidate', '0006_interviewrecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerEvaluationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('interview_id', models.CharField(db_index=True, max_length=32)),
+                ('question_index', models.IntegerField()),
+                ('question', models.TextField()),
+                ('answer', models.TextField()),
+                ('mode', models.CharField(max_length=20)),
+                ('role', models.CharField(blank=True, max_length=100)),
+                ('designation', models.CharField(blank=True, max_length=100)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='pending', max_length=20)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('attempts', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answer_evaluation_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['interview_id', 'question_index'],
+                'unique_together': {('interview_id', 'question_index')},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.23 on 2026-10-17 06:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0008_evaluationcacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionBankEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(max_length=100)),
+                ('designation', models.CharField(max_length=100)),
+                ('difficulty', models.CharField(max_length=20)),
+                ('question', models.TextField()),
+                ('question_hash', models.CharField(max_length=64)),
+                ('times_served', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['role', 'designation', 'difficulty', 'times_served'], name='candidate_q_role_13481a_idx')],
+                'unique_together': {('role', 'designation', 'difficulty', 'question_hash')},
+            },
+        ),
+    ]
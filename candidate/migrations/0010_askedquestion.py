@@ -0,0 +1,62 @@
+# Generated by Django 4.2.23 on 2026-10-17 06:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import hashlib
+import re
+
+
+def backfill_asked_questions(apps, schema_editor):
+    """Populate history from the questions stored in existing interview records."""
+    InterviewRecord = apps.get_model('candidate', 'InterviewRecord')
+    AskedQuestion = apps.get_model('candidate', 'AskedQuestion')
+
+    batch = []
+    for record in InterviewRecord.objects.all().iterator():
+        for item in record.evaluations or []:
+            question = item.get('question') if isinstance(item, dict) else None
+            if not question:
+                continue
+            normalized = re.sub(r'\s+', ' ', question.strip()).lower()
+            batch.append(AskedQuestion(
+                candidate_id=record.candidate_id,
+                interview_id=record.id,
+                designation=record.designation,
+                question=question,
+                question_hash=hashlib.sha256(normalized.encode('utf-8')).hexdigest(),
+                asked_at=record.created_at,
+            ))
+        if len(batch) >= 500:
+            AskedQuestion.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        AskedQuestion.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('candidate', '0009_questionbankentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AskedQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('designation', models.CharField(max_length=100)),
+                ('question', models.TextField()),
+                ('question_hash', models.CharField(max_length=64)),
+                ('asked_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asked_questions', to=settings.AUTH_USER_MODEL)),
+                ('interview', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asked_questions', to='candidate.interviewrecord')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['candidate', 'designation', 'asked_at'], name='candidate_a_candida_409df9_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_asked_questions, migrations.RunPython.noop),
+    ]
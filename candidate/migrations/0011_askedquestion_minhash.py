@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-17 06:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0010_askedquestion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='askedquestion',
+            name='minhash',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.23 on 2026-10-17 06:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('candidate', '0011_askedquestion_minhash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeParseJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resume_path', models.CharField(max_length=500)),
+                ('previous_designation', models.CharField(blank=True, max_length=100)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed'), ('timeout', 'Timed out')], db_index=True, default='pending', max_length=20)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('message', models.CharField(blank=True, max_length=255)),
+                ('message_level', models.CharField(blank=True, max_length=20)),
+                ('message_shown', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resume_parse_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
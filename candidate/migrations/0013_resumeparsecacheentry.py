@@ -0,0 +1,33 @@
+# Generated by Django 4.2.23 on 2026-10-17 06:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0012_resumeparsejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeParseCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('parser_version', models.CharField(max_length=16)),
+                ('field', models.CharField(blank=True, max_length=20)),
+                ('skills', models.JSONField(blank=True, default=list)),
+                ('text_digest', models.CharField(blank=True, max_length=64)),
+                ('pages_processed', models.IntegerField(default=0)),
+                ('hit_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='resumeparsejob',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.23 on 2026-10-17 06:33
+
+import ai_interview_platform.resume_storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0013_resumeparsecacheentry'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='candidateprofile',
+            name='resume',
+            field=models.FileField(blank=True, null=True, storage=ai_interview_platform.resume_storage.get_resume_storage, upload_to='resumes/'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def track_legacy_resumes(apps, schema_editor):
+    """
+    Give resumes saved before content addressing a ResumeObject row.
+
+    Those names were upserted, so every profile that uploaded e.g.
+    'resume.pdf' points at the same object; the row counts them all so the
+    object is only removed when the last of those profiles lets go.
+    """
+    CandidateProfile = apps.get_model('candidate', 'CandidateProfile')
+    ResumeObject = apps.get_model('candidate', 'ResumeObject')
+
+    tracked = set(ResumeObject.objects.values_list('name', flat=True))
+    shared = (
+        CandidateProfile.objects.exclude(resume='').exclude(resume__isnull=True)
+        .values('resume').annotate(references=Count('id'))
+    )
+    ResumeObject.objects.bulk_create([
+        ResumeObject(name=row['resume'], content_hash='', size=0, ref_count=row['references'])
+        for row in shared
+        if row['resume'] not in tracked
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0016_outboxemail'),
+    ]
+
+    operations = [
+        migrations.RunPython(track_legacy_resumes, migrations.RunPython.noop),
+    ]
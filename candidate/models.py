@@ -4,14 +4,14 @@ from django.utils import timezone
 from datetime import timedelta
 import random
 import string
-from ai_interview_platform.supabase_storage import SupabaseStorage
+from ai_interview_platform.resume_storage import get_resume_storage
 
 
 class CandidateProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     # Store resumes as Cloudinary “raw” files so PDFs are accessible via URL
     resume = models.FileField(
-        storage=SupabaseStorage(),
+        storage=get_resume_storage,
         upload_to='resumes/',
         null=True,
         blank=True,
@@ -102,5 +102,173 @@ class InterviewRecord(models.Model):
     
     def __str__(self):
         return f"Interview {self.id} - {self.candidate.email} - {self.designation}"
-    
-   
\ No newline at end of file
+
+
+class AskedQuestion(models.Model):
+    """Normalized history of questions asked to a candidate, one row per question per interview."""
+    candidate = models.ForeignKey(User, on_delete=models.CASCADE, related_name='asked_questions')
+    interview = models.ForeignKey(InterviewRecord, on_delete=models.CASCADE, related_name='asked_questions')
+    designation = models.CharField(max_length=100)
+    question = models.TextField()
+    question_hash = models.CharField(max_length=64)
+    minhash = models.JSONField(default=list, blank=True)  # Near-duplicate signature, see utils/near_duplicates.py
+    asked_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['candidate', 'designation', 'asked_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.candidate.email} - {self.designation} - {self.question[:60]}"
+
+
+class AnswerEvaluationJob(models.Model):
+    """Queued AI evaluation of a single interview answer, scored while the interview is in progress."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    candidate = models.ForeignKey(User, on_delete=models.CASCADE, related_name='answer_evaluation_jobs')
+    interview_id = models.CharField(max_length=32, db_index=True)  # Per-interview token kept in the session
+    question_index = models.IntegerField()
+    question = models.TextField()
+    answer = models.TextField()
+    mode = models.CharField(max_length=20)
+    role = models.CharField(max_length=100, blank=True)
+    designation = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', db_index=True)
+    result = models.JSONField(null=True, blank=True)
+    attempts = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ['interview_id', 'question_index']
+        ordering = ['interview_id', 'question_index']
+
+    def __str__(self):
+        return f"Evaluation job {self.interview_id}#{self.question_index} - {self.status}"
+
+
+class EvaluationCacheEntry(models.Model):
+    """Cached AI evaluation keyed by a hash of the normalized answer inputs and rubric version."""
+    key = models.CharField(max_length=64, unique=True)
+    result = models.JSONField()
+    hit_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"Evaluation cache {self.key[:12]} ({self.hit_count} hits)"
+
+
+class QuestionBankEntry(models.Model):
+    """Pre-generated interview question served without a live Gemini call."""
+    role = models.CharField(max_length=100)
+    designation = models.CharField(max_length=100)
+    difficulty = models.CharField(max_length=20)
+    question = models.TextField()
+    question_hash = models.CharField(max_length=64)
+    times_served = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['role', 'designation', 'difficulty', 'question_hash']
+        indexes = [
+            models.Index(fields=['role', 'designation', 'difficulty', 'times_served']),
+        ]
+
+    def __str__(self):
+        return f"[{self.role}/{self.designation}/{self.difficulty}] {self.question[:60]}"
+
+
+class ResumeParseJob(models.Model):
+    """Resume parse running outside the request; the upload page polls it by id."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+        ('timeout', 'Timed out'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='resume_parse_jobs')
+    resume_path = models.CharField(max_length=500)  # Temp file the parser reads; removed when the job ends
+    content_hash = models.CharField(max_length=64, blank=True)  # SHA-256 of the uploaded bytes, see ResumeParseCacheEntry
+    previous_designation = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', db_index=True)
+    result = models.JSONField(null=True, blank=True)
+    message = models.CharField(max_length=255, blank=True)
+    message_level = models.CharField(max_length=20, blank=True)
+    message_shown = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Resume parse job {self.pk} for {self.user.email} - {self.status}"
+
+
+class ResumeParseCacheEntry(models.Model):
+    """Parse result of a resume file, keyed by the SHA-256 of its bytes so re-uploads skip extraction."""
+    content_hash = models.CharField(max_length=64, unique=True)
+    parser_version = models.CharField(max_length=16)
+    field = models.CharField(max_length=20, blank=True)
+    skills = models.JSONField(default=list, blank=True)
+    text_digest = models.CharField(max_length=64, blank=True)  # SHA-256 of the extracted text
+    pages_processed = models.IntegerField(default=0)
+    hit_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Resume parse cache {self.content_hash[:12]} ({self.field or 'unknown'})"
+
+
+class ResumeObject(models.Model):
+    """Content-addressed resume object in storage, shared by every profile that uploaded the same bytes."""
+    name = models.CharField(max_length=255, unique=True)  # Storage name, derived from the content hash
+    content_hash = models.CharField(max_length=64, db_index=True)
+    size = models.BigIntegerField(default=0)
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
+class OutboxEmail(models.Model):
+    """Transactional email waiting for (or done with) delivery through Brevo; views enqueue, a worker sends."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    html_content = models.TextField()
+    text_content = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    request_ms = models.IntegerField(null=True, blank=True)  # Duration of the successful Brevo call
+    latency_ms = models.IntegerField(null=True, blank=True)  # Enqueue to accepted by Brevo
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.to_email} - {self.subject[:40]} - {self.status}"
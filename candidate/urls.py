@@ -7,6 +7,7 @@ urlpatterns = [
     path('logout/', views.logout_view, name='logout'),
     path('dashboard/', views.dashboard_view, name='candidate_dashboard'),
     path('upload-resume/', views.upload_resume, name='upload_resume'),
+    path('upload-resume/status/<int:job_id>/', views.resume_parse_status, name='resume_parse_status'),
     path('select-designation/', views.select_designation, name='select_designation'),
     path('ai-interview/', views.ai_interview, name='ai_interview'),
     path('interview-question/', views.interview_question, name='interview_question'),
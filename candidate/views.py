@@ -7,14 +7,23 @@ from django.http import JsonResponse, HttpResponse
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 from django.core.mail import send_mail
+from django.core.files import File
+from django.core.paginator import Paginator
+from django.conf import settings
+from django.db import transaction
 
 import os
+import hashlib
 import tempfile
+from contextlib import ExitStack
+import uuid
 
-from ai_interview_platform.utils.question_generator import generate_questions
-from ai_interview_platform.utils.evaluator import evaluate_answer
-from ai_interview_platform.utils.resume_utils import parse_resume_and_detect_field
-from ai_interview_platform.utils.email_service import send_brevo_email
+from ai_interview_platform.utils.question_generator import generate_questions, record_asked_questions
+from ai_interview_platform.utils.evaluator import evaluate_interview_answers, get_evaluation_deadline
+from ai_interview_platform.utils.evaluation_queue import enqueue_answer_evaluation, collect_interview_evaluations
+from ai_interview_platform.utils.resume_parse_queue import start_resume_parse, expire_stale_job, apply_parse_result
+from ai_interview_platform.utils.resume_cache import get_cached_parse
+from ai_interview_platform.utils.email_service import enqueue_email
 
 from .forms import (
     UserRegisterForm,
@@ -29,20 +38,23 @@ from .models import (
     PasswordResetOTP,
     EmailConfirmationOTP,
     InterviewRecord,
+    ResumeParseJob,
 )
-from hr.models import HR, HRTimeSlot, HRInterviewBooking, HRInterviewFeedback, CandidateFeedbackReply
+from hr.models import HR, HRTimeSlot, HRInterviewBooking, HRInterviewFeedback, CandidateFeedbackReply, normalize_designation
 
 def send_email_otp(email, otp, subject, message):
     
-    """Send OTP via email using Brevo API"""
+    """Queue the OTP email in the outbox; it is delivered via the Brevo API in the background"""
     try:
-        return send_brevo_email(
+        enqueue_email(
             email,
             subject,
-            f"<p>{message}</p>"
+            f"<p>{message}</p>",
+            message
         )
+        return True
     except Exception as e:
-        print(f"❌ Email sending failed: {e}")
+        print(f"❌ Email queueing failed: {e}")
         print(f"   Attempted to send to: {email}")
         return False
    
@@ -299,6 +311,8 @@ def upload_resume(request):
                 return JsonResponse({"success": True, "redirect": reverse("candidate_dashboard")})
             return redirect("candidate_dashboard")
 
+        # Validation swaps the instance's file, so remember the one being replaced
+        previous_resume_name = profile.resume.name if profile.resume else ""
         form = ResumeUploadForm(request.POST, request.FILES, instance=profile)
         if not form.is_valid():
             if is_ajax:
@@ -313,24 +327,41 @@ def upload_resume(request):
         current_designation = profile.designation
 
         # Parse resume BEFORE saving to Cloudinary (file is in memory here)
+        # One pass over the upload chunks feeds the hasher and the parser's temp file;
+        # storage then streams that same temp file, so no step holds the whole resume in memory
         temp_resume_path = None
+        content_hash = ""
         uploaded_file = request.FILES.get('resume')
         if uploaded_file:
             try:
-                suffix = '.pdf' if uploaded_file.name.lower().endswith('.pdf') else '.docx'
+                # The parser sniffs the format from the content; the suffix is only informational
+                suffix = os.path.splitext(uploaded_file.name)[1].lower()
+                hasher = hashlib.sha256()
                 with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
                     for chunk in uploaded_file.chunks():
+                        hasher.update(chunk)
                         tmp.write(chunk)
                     temp_resume_path = tmp.name
-                # Reset file pointer so form.save() can still upload it
-                uploaded_file.seek(0)
+                content_hash = hasher.hexdigest()
                 print(f"📎 Created temp resume for parsing: {temp_resume_path}")
             except Exception as e:
                 print(f"⚠️ Could not create temp file: {e}")
                 temp_resume_path = None
+                # Upload straight from the request file instead
+                uploaded_file.seek(0)
+                profile.resume = uploaded_file
 
         try:
-            form.save()  # Upload to Cloudinary
+            with ExitStack() as upload_files:
+                if temp_resume_path:
+                    # Closed when the block exits, whether or not the save succeeds
+                    upload_stream = upload_files.enter_context(open(temp_resume_path, 'rb'))
+                    resume_file = File(upload_stream, name=uploaded_file.name)
+                    resume_file.content_hash = content_hash  # Spares storage a second hashing pass
+                    profile.resume = resume_file
+                # The storage reference taken by the upload rolls back if the profile save fails
+                with transaction.atomic():
+                    form.save()  # Upload to Supabase
         except Exception as e:
             print(f"❌ FORM SAVE ERROR: {type(e).__name__}: {e}")
             import traceback
@@ -339,42 +370,33 @@ def upload_resume(request):
                 return JsonResponse({"error": f"Save failed: {str(e)}"}, status=500)
             raise
 
-        # Parse from temp file created before upload
-        if temp_resume_path:
+        # Release the replaced resume (the save above took its own reference, even for identical bytes);
+        # shared objects stay until their last reference goes
+        if previous_resume_name:
+            profile.resume.storage.delete(previous_resume_name)
+
+        # Same file parsed before: reuse the result instead of extracting again
+        cached = get_cached_parse(content_hash) if temp_resume_path else None
+        if cached is not None:
             try:
-                parsed = parse_resume_and_detect_field(temp_resume_path)
-                detected_field = parsed.get("field") or ""
-                if detected_field:
-                    profile.field = detected_field
-                if current_designation and profile.field:
-                    it_designations = ["developer", "engineer", "programmer", "analyst", "architect", "administrator", "specialist", "consultant"]
-                    non_it_designations = ["hr", "sales", "marketing", "manager", "executive", "coordinator", "assistant", "writer", "recruiter", "accountant", "analyst"]
-                    if profile.field == "IT" and any(tech in current_designation.lower() for tech in it_designations):
-                        profile.designation = current_designation
-                    elif profile.field == "Non-IT" and any(non_tech in current_designation.lower() for non_tech in non_it_designations):
-                        profile.designation = current_designation
-                    else:
-                        profile.designation = ""
-                else:
-                    profile.designation = ""
-                profile.save()
-                if profile.field:
-                    if profile.designation:
-                        messages.success(request, f"Resume parsed as {profile.field}. Your designation has been preserved.")
-                    else:
-                        messages.success(request, f"Resume parsed as {profile.field}. Please select your designation.")
-                else:
-                    messages.warning(request, "Resume uploaded but could not detect IT/Non-IT. Please select manually.")
+                os.unlink(temp_resume_path)
             except Exception as e:
-                print(f"❌ Resume parsing failed: {e}")
-                messages.warning(request, "Resume uploaded, but parsing failed. Please select your designation manually.")
-            finally:
-                try:
-                    if temp_resume_path and os.path.exists(temp_resume_path):
-                        os.unlink(temp_resume_path)
-                        print(f"🧹 Removed temp file: {temp_resume_path}")
-                except Exception as e:
-                    print(f"⚠️ Failed to delete temp file: {e}")
+                print(f"⚠️ Failed to delete temp file: {e}")
+            level, message = apply_parse_result(profile, cached, current_designation)
+            messages.add_message(request, messages.SUCCESS if level == "success" else messages.WARNING, message)
+            print(f"♻️ Resume parse cache hit: {content_hash[:12]}")
+
+        # Parse from temp file created before upload, outside the request
+        elif temp_resume_path:
+            job = start_resume_parse(request.user, temp_resume_path, current_designation, content_hash)
+            if is_ajax:
+                return JsonResponse({
+                    "success": True,
+                    "job_id": job.pk,
+                    "status_url": reverse("resume_parse_status", args=[job.pk]),
+                    "redirect": reverse("candidate_dashboard"),
+                })
+            messages.info(request, "Resume uploaded. We are analysing it now; your field will update shortly.")
 
         if is_ajax:
             return JsonResponse({"success": True, "redirect": reverse("candidate_dashboard")})
@@ -383,6 +405,29 @@ def upload_resume(request):
     form = ResumeUploadForm(instance=profile)
     return render(request, "candidate/upload_resume.html", {"form": form})
 
+@login_required
+def resume_parse_status(request, job_id):
+    """Polled by the upload page until the background resume parse finishes."""
+    job = ResumeParseJob.objects.filter(pk=job_id, user=request.user).first()
+    if job is None:
+        return JsonResponse({"error": "Resume parse job not found."}, status=404)
+
+    job = expire_stale_job(job)
+    finished = job.status not in ("pending", "running")
+    data = {"status": job.status, "finished": finished}
+    if finished:
+        data.update({
+            "field": (job.result or {}).get("field", ""),
+            "message": job.message,
+            "redirect": reverse("candidate_dashboard"),
+        })
+        # Show the outcome once on the next page, like the old inline flow did
+        if job.message and not job.message_shown:
+            level = messages.SUCCESS if job.message_level == "success" else messages.WARNING
+            messages.add_message(request, level, job.message)
+            ResumeParseJob.objects.filter(pk=job.pk).update(message_shown=True)
+    return JsonResponse(data)
+
 @login_required
 def select_designation(request):
     profile = CandidateProfile.objects.get(user=request.user)
@@ -424,6 +469,8 @@ def ai_interview(request):
     questions = generate_questions(profile.field, profile.designation, candidate_id=request.user.id)
     request.session['interview_questions'] = questions
     request.session['interview_answers'] = []
+    # Token tying queued answer evaluations to this interview
+    request.session['interview_id'] = uuid.uuid4().hex
 
     # Redirect to actual Q&A view
     return redirect('interview_question')
@@ -455,6 +502,26 @@ def interview_question(request):
                 'mode': mode
             })
 
+            # Start scoring now so the work overlaps with the next question
+            interview_id = request.session.get('interview_id')
+            if not interview_id:
+                interview_id = request.session['interview_id'] = uuid.uuid4().hex
+            try:
+                profile = CandidateProfile.objects.get(user=request.user)
+                enqueue_answer_evaluation(
+                    request.user,
+                    interview_id,
+                    current_index,
+                    questions[current_index],
+                    answer,
+                    mode,
+                    role=profile.field,
+                    designation=profile.designation
+                )
+            except Exception as e:
+                # interview_complete evaluates anything that was not queued
+                print('Failed to queue answer evaluation:', e)
+
         request.session['interview_answers'] = answers
         return redirect('interview_question')
 
@@ -475,16 +542,28 @@ def interview_complete(request):
     all_mistakes = []
     all_improvements = []
 
-    for item in answers:
+    # One Gemini time budget for everything this request still has to evaluate
+    deadline = get_evaluation_deadline()
+
+    # Most answers were scored in the background while the interview ran
+    interview_id = request.session.pop('interview_id', None)
+    results = collect_interview_evaluations(interview_id, deadline=deadline) if interview_id else {}
+
+    # Evaluate anything that never made it into the queue; results come back in question order
+    missing = [index for index, item in enumerate(answers)
+               if item['answer'] != 'Skipped' and index not in results]
+    if missing:
+        late_results = evaluate_interview_answers(
+            [answers[index] for index in missing],
+            role=profile.field,
+            designation=profile.designation,
+            deadline=deadline
+        )
+        results.update(zip(missing, late_results))
+
+    for index, item in enumerate(answers):
         if item['answer'] != 'Skipped':
-            # Use enhanced evaluation with role and designation context
-            result = evaluate_answer(
-                item['question'], 
-                item['answer'], 
-                role=profile.field, 
-                designation=profile.designation,
-                mode=item['mode']
-            )
+            result = results.get(index)
             if result:
                 scores = {k: v for k, v in result.items() if k in ["Relevance and Clarity", "Technical Knowledge", "Communication Skills", "Problem-Solving Approach", "Experience and Examples"]}
                 feedback = result.get("Detailed Feedback", "")
@@ -535,7 +614,7 @@ def interview_complete(request):
         total_questions = len(answers)
         answered_questions = len([q for q in evaluations if q.get('answer') and q.get('answer') != 'Skipped'])
         skipped_questions = len([q for q in evaluations if q.get('answer') == 'Skipped'])
-        InterviewRecord.objects.create(
+        record = InterviewRecord.objects.create(
             candidate=request.user,
             role=profile.field or '',
             designation=profile.designation or '',
@@ -545,6 +624,7 @@ def interview_complete(request):
             answered_questions=answered_questions,
             skipped_questions=skipped_questions,
         )
+        record_asked_questions(record)
     except Exception as e:
         print('Failed to persist interview:', e)
 
@@ -670,20 +750,11 @@ def hr_interview_booking(request):
         messages.error(request, 'Please select your designation first.')
         return redirect('hr_interview_role_selection')
     
-    # Fetch active HRs and filter in Python to avoid JSON contains lookup unsupported on SQLite
-    designation_normalized = (profile.designation or '').strip().lower()
-    active_hrs = HR.objects.filter(is_active=True)
-    available_hrs = []
-    for hr in active_hrs:
-        try:
-            handled = hr.designations_handled or []
-            # Normalize to lowercase strings
-            handled_norm = [str(x).strip().lower() for x in handled]
-            if designation_normalized in handled_norm:
-                available_hrs.append(hr)
-        except Exception:
-            # If malformed data, skip this HR
-            continue
+    # One indexed join on the normalized HR-designation table
+    available_hrs = HR.objects.filter(
+        is_active=True,
+        designation_links__designation_key=normalize_designation(profile.designation)
+    )
     
     context = {
         'profile': profile,
@@ -823,116 +894,61 @@ def hr_booking_confirmation(request, booking_id):
 @login_required
 def hr_interview_history(request):
     """Show candidate's HR interview history with real-time status tracking"""
-    from django.utils import timezone
-    from datetime import datetime, timedelta
+    from django.db.models import Q
 
     now = timezone.localtime()
-    current_time = now.time()
-    current_date = now.date()
-
-    all_bookings = HRInterviewBooking.objects.filter(candidate=request.user).order_by('-created_at')
-
-    upcoming_bookings = []
-    missed_bookings = []
-    completed_bookings = []
+    per_page = getattr(settings, 'INTERVIEWS_PER_PAGE', 20)
+    # A scheduled interview whose join window has closed counts as missed
+    upcoming = HRInterviewBooking.upcoming_q(now)
+
+    bookings = HRInterviewBooking.objects.filter(candidate=request.user).select_related('hr', 'time_slot')
+
+    # Nearest first
+    upcoming_bookings = Paginator(
+        bookings.filter(upcoming).order_by('time_slot__starts_at'), per_page
+    ).get_page(request.GET.get('upcoming_page'))
+    # Most recent first; cancelled and no_show are combined as "missed" interviews
+    completed_bookings = Paginator(
+        bookings.filter(status='completed').order_by('-time_slot__starts_at'), per_page
+    ).get_page(request.GET.get('completed_page'))
+    missed_bookings = Paginator(
+        bookings.filter(
+            Q(status__in=['no_show', 'cancelled']) |
+            (Q(status='scheduled') & ~upcoming)
+        ).order_by('-time_slot__starts_at'), per_page
+    ).get_page(request.GET.get('missed_page'))
 
-    for booking in all_bookings:
-        if booking.status == 'completed':
-            completed_bookings.append(booking)
-        elif booking.status == 'scheduled':
-            interview_start = timezone.make_aware(
-                datetime.combine(booking.time_slot.date, booking.time_slot.start_time),
-                timezone.get_current_timezone()
-            )
-            interview_end = timezone.make_aware(
-                datetime.combine(booking.time_slot.date, booking.time_slot.end_time),
-                timezone.get_current_timezone()
-            )
-            if interview_start.date() < current_date:
-                booking.status = 'no_show'
-                booking.save()
-                missed_bookings.append(booking)
-                continue
-            if interview_start.date() == current_date:
-                # Past end -> if >10 minutes after end, mark as no_show (all times aware, IST)
-                minutes_after_end = (now - interview_end).total_seconds() / 60
-                if minutes_after_end > 10:
-                    booking.status = 'no_show'
-                    booking.save()
-                    missed_bookings.append(booking)
-                elif minutes_after_end >= -40:  # from 30 min slot start until 10 min after end
-                    upcoming_bookings.append(booking)
-                else:
-                    # Not yet started today
-                    upcoming_bookings.append(booking)
-            else:
-                # Future date
-                upcoming_bookings.append(booking)
-        elif booking.status in ['no_show', 'cancelled']:
-            # Combine cancelled and no_show as "missed" interviews
-            missed_bookings.append(booking)
-    
-    # Sort each section by nearest date/time first (ascending order)
-    upcoming_bookings.sort(key=lambda x: (x.time_slot.date, x.time_slot.start_time))
-    completed_bookings.sort(key=lambda x: (x.time_slot.date, x.time_slot.start_time), reverse=True)  # Most recent first
-    missed_bookings.sort(key=lambda x: (x.time_slot.date, x.time_slot.start_time), reverse=True)  # Most recent first
-    
     context = {
         'upcoming_bookings': upcoming_bookings,
         'missed_bookings': missed_bookings,
         'completed_bookings': completed_bookings,
-        'current_time': current_time,
-        'current_date': current_date,
+        'current_time': now.time(),
+        'current_date': now.date(),
     }
     
     return render(request, 'candidate/hr_interview_history.html', context)
 
 @login_required
 def upcoming_hr_interviews(request):
-    from django.utils import timezone
-    from datetime import datetime, timedelta
-
     now = timezone.localtime()
 
-    all_bookings = HRInterviewBooking.objects.filter(
-        candidate=request.user,
-        status='scheduled'
-    ).order_by('time_slot__date', 'time_slot__start_time')
-
-    upcoming_bookings = []
-
-    for booking in all_bookings:
-        interview_start = timezone.make_aware(
-            datetime.combine(
-                booking.time_slot.date,
-                booking.time_slot.start_time
-            ),
-            timezone.get_current_timezone()
-        )
-
-        join_window_end = interview_start + timedelta(minutes=10)  # Join allowed 11:00–11:10 for 11:00 slot
-
-        # ✅ SHOW interview in list (future or within 10‑min join window)
-        if now < join_window_end:
-            upcoming_bookings.append(booking)
-
-        # ❌ MARK NO SHOW if join window (10 min after start) missed
-        if now > join_window_end:
-            booking.status = 'no_show'
-            booking.save()
+    # Future interviews, or ones still inside the 10-minute join window; nearest first.
+    # Bookings whose window passed are marked no_show by the sweep_no_shows command.
+    upcoming_qs = HRInterviewBooking.objects.filter(
+        HRInterviewBooking.upcoming_q(now),
+        candidate=request.user
+    ).select_related('hr', 'time_slot').order_by('time_slot__starts_at')
+    page_obj = Paginator(upcoming_qs, getattr(settings, 'INTERVIEWS_PER_PAGE', 20)).get_page(request.GET.get('page'))
 
     # Per-booking join window end (start + 10 min) for template
     upcoming_with_ends = []
-    for b in upcoming_bookings:
-        start_dt = timezone.make_aware(
-            datetime.combine(b.time_slot.date, b.time_slot.start_time),
-            timezone.get_current_timezone()
-        )
-        join_window_end_time = (start_dt + timedelta(minutes=10)).time()
+    for b in page_obj:
+        join_window_end_time = (timezone.localtime(b.time_slot.starts_at) + HRInterviewBooking.JOIN_WINDOW).time()
         upcoming_with_ends.append({'booking': b, 'join_window_end': join_window_end_time})
 
     context = {
         'upcoming_with_ends': upcoming_with_ends,
+        'page_obj': page_obj,
         'current_time': now.time(),
         'current_date': now.date(),
     }
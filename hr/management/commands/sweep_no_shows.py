@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from hr.models import HRInterviewBooking
+from contextlib import contextmanager
+import os
+import tempfile
+import time
+
+# Arbitrary key shared by every sweeper process
+NO_SHOW_SWEEP_LOCK_KEY = 72101
+
+@contextmanager
+def sweep_lock():
+    """
+    Yield True if this process holds the sweeper lock, False if another does.
+
+    PostgreSQL uses a session advisory lock so sweepers on different hosts
+    exclude each other; other databases fall back to a local file lock.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_try_advisory_lock(%s)', [NO_SHOW_SWEEP_LOCK_KEY])
+            acquired = cursor.fetchone()[0]
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT pg_advisory_unlock(%s)', [NO_SHOW_SWEEP_LOCK_KEY])
+        return
+
+    import fcntl
+    with open(os.path.join(tempfile.gettempdir(), 'sweep_no_shows.lock'), 'w') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+class Command(BaseCommand):
+    help = 'Mark scheduled interviews whose slot has ended as no_show'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace', type=int, default=10,
+                            help='Minutes after the slot end before a booking counts as missed')
+        parser.add_argument('--loop', type=int, default=0,
+                            help='Keep running, sleeping this many seconds between passes')
+
+    def handle(self, *args, **options):
+        while True:
+            with sweep_lock() as acquired:
+                if acquired:
+                    marked = HRInterviewBooking.mark_no_shows(grace_minutes=options['grace'])
+                    self.stdout.write(self.style.SUCCESS(f'Marked {marked} interview(s) as no_show'))
+                else:
+                    self.stdout.write('Another sweeper is running; skipping this pass')
+            if not options['loop']:
+                return
+            time.sleep(options['loop'])
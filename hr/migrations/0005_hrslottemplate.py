@@ -0,0 +1,28 @@
+# Generated by Django 4.2.23 on 2026-10-17 06:38
+
+import datetime
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0004_hrinterviewbooking_actual_duration_minutes_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HRSlotTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day_start', models.TimeField(default=datetime.time(9, 0))),
+                ('day_end', models.TimeField(default=datetime.time(17, 0))),
+                ('slot_minutes', models.PositiveSmallIntegerField(default=30)),
+                ('blackout_days', models.CharField(blank=True, default='6', help_text='Comma-separated weekdays without slots (Monday=0, Sunday=6)', max_length=20)),
+                ('days_ahead', models.PositiveSmallIntegerField(default=7)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hr', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='slot_template', to='hr.hr')),
+            ],
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.23 on 2026-10-17 06:40
+
+from datetime import datetime, timedelta
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_slot_bounds(apps, schema_editor):
+    """Fill starts_at/ends_at for existing slots (same rule as HRTimeSlot.set_bounds)."""
+    HRTimeSlot = apps.get_model('hr', 'HRTimeSlot')
+    tz = timezone.get_default_timezone()
+
+    batch = []
+    for slot in HRTimeSlot.objects.all().iterator():
+        slot.starts_at = timezone.make_aware(datetime.combine(slot.date, slot.start_time), tz)
+        if slot.end_time <= slot.start_time:
+            slot.ends_at = slot.starts_at + timedelta(minutes=30)
+        else:
+            slot.ends_at = timezone.make_aware(datetime.combine(slot.date, slot.end_time), tz)
+        batch.append(slot)
+        if len(batch) >= 500:
+            HRTimeSlot.objects.bulk_update(batch, ['starts_at', 'ends_at'])
+            batch = []
+    if batch:
+        HRTimeSlot.objects.bulk_update(batch, ['starts_at', 'ends_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0005_hrslottemplate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hrtimeslot',
+            name='ends_at',
+            field=models.DateTimeField(db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='hrtimeslot',
+            name='starts_at',
+            field=models.DateTimeField(db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_slot_bounds, migrations.RunPython.noop),
+    ]
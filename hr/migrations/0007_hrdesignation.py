@@ -0,0 +1,48 @@
+# Generated by Django 4.2.23 on 2026-10-17 06:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_hr_designations(apps, schema_editor):
+    """Index the designations of existing HRs (same rule as HR.sync_designations)."""
+    HR = apps.get_model('hr', 'HR')
+    HRDesignation = apps.get_model('hr', 'HRDesignation')
+
+    batch = []
+    for hr in HR.objects.all().iterator():
+        handled = hr.designations_handled if isinstance(hr.designations_handled, list) else []
+        seen = set()
+        for designation in handled:
+            key = str(designation or '').strip().casefold()
+            if key and key not in seen:
+                seen.add(key)
+                batch.append(HRDesignation(hr_id=hr.id, designation=str(designation).strip(), designation_key=key))
+        if len(batch) >= 500:
+            HRDesignation.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        HRDesignation.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0006_hrtimeslot_starts_at_ends_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HRDesignation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('designation', models.CharField(max_length=100)),
+                ('designation_key', models.CharField(max_length=100)),
+                ('hr', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='designation_links', to='hr.hr')),
+            ],
+            options={
+                'unique_together': {('designation_key', 'hr')},
+            },
+        ),
+        migrations.RunPython(backfill_hr_designations, migrations.RunPython.noop),
+    ]
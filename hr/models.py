@@ -3,9 +3,13 @@ from django.contrib.auth.models import User
 import hashlib
 import random
 import string
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, time, date
 import uuid
 
+def normalize_designation(designation):
+    """Case-folded, trimmed form of a designation used for HR matching."""
+    return str(designation or '').strip().casefold()
+
 class HR(models.Model):
     GENDER_CHOICES = [
         ('M', 'Male'),
@@ -77,10 +81,40 @@ class HR(models.Model):
         hashed_password = hashlib.sha256(password.encode()).hexdigest()
         return self.password == hashed_password
     
+    def sync_designations(self):
+        """Rebuild this HR's HRDesignation rows from designations_handled."""
+        handled = self.designations_handled if isinstance(self.designations_handled, list) else []
+        wanted = {}
+        for designation in handled:
+            key = normalize_designation(designation)
+            if key:
+                wanted.setdefault(key, str(designation).strip())
+        
+        self.designation_links.exclude(designation_key__in=list(wanted)).delete()
+        existing = set(self.designation_links.values_list('designation_key', flat=True))
+        HRDesignation.objects.bulk_create([
+            HRDesignation(hr=self, designation=designation, designation_key=key)
+            for key, designation in wanted.items()
+            if key not in existing
+        ], ignore_conflicts=True)
+    
     class Meta:
         verbose_name = "HR"
         verbose_name_plural = "HRs"
 
+class HRDesignation(models.Model):
+    """One designation an HR interviews for, normalized for indexed matching"""
+    hr = models.ForeignKey(HR, on_delete=models.CASCADE, related_name='designation_links')
+    designation = models.CharField(max_length=100)
+    designation_key = models.CharField(max_length=100)  # normalize_designation(designation)
+    
+    class Meta:
+        # Key first, so this constraint's index also serves designation lookups
+        unique_together = ['designation_key', 'hr']
+    
+    def __str__(self):
+        return f"{self.hr.full_name} - {self.designation}"
+
 class HRTimeSlot(models.Model):
     """HR available time slots for interviews"""
     hr = models.ForeignKey(HR, on_delete=models.CASCADE, related_name='time_slots')
@@ -89,6 +123,9 @@ class HRTimeSlot(models.Model):
     end_time = models.TimeField()    # 30 minutes later
     is_available = models.BooleanField(default=True)
     is_managed = models.BooleanField(default=False)  # HR can manage this slot
+    # date + start/end time as aware datetimes in TIME_ZONE, kept in sync by save()
+    starts_at = models.DateTimeField(null=True, editable=False, db_index=True)
+    ends_at = models.DateTimeField(null=True, editable=False, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -98,6 +135,27 @@ class HRTimeSlot(models.Model):
     def __str__(self):
         return f"{self.hr.full_name} - {self.date} {self.start_time}"
     
+    def set_bounds(self):
+        """Recompute starts_at/ends_at from date, start_time and end_time."""
+        from django.utils import timezone
+        self.starts_at = timezone.make_aware(
+            datetime.combine(self.date, self.start_time), timezone.get_default_timezone()
+        )
+        end_time = self.end_time
+        if end_time <= self.start_time:
+            self.ends_at = self.starts_at + timedelta(minutes=30)  # Same fallback as safe_end_time
+        else:
+            self.ends_at = timezone.make_aware(
+                datetime.combine(self.date, end_time), timezone.get_default_timezone()
+            )
+    
+    def save(self, *args, **kwargs):
+        self.set_bounds()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'date', 'start_time', 'end_time'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'starts_at', 'ends_at'}
+        super().save(*args, **kwargs)
+    
     @property
     def time_display(self):
         return f"{self.start_time.strftime('%I:%M %p')} - {self.end_time.strftime('%I:%M %p')}"
@@ -125,6 +183,105 @@ class HRTimeSlot(models.Model):
     def is_booked(self):
         return hasattr(self, 'interview_booking')
 
+    @classmethod
+    def generate_from_template(cls, hr, template=None, start_date=None):
+        """
+        Create the managed slots the HR's template calls for from ``start_date``
+        (default today), skipping any that would overlap an existing slot.
+
+        The whole range is computed in memory, existing slot intervals are
+        fetched in one query and the new slots inserted in one bulk INSERT.
+        Overlap (not just equal start times) matters because the slot length
+        can change between generations.
+
+        Returns:
+            int: Number of slots created
+        """
+        template = template or HRSlotTemplate.for_hr(hr)
+        start_date = start_date or date.today()
+        wanted = template.slots_from(start_date)
+        if not wanted:
+            return 0
+
+        existing_by_date = {}
+        for slot_date, starts_at, ends_at in cls.objects.filter(
+            hr=hr,
+            date__gte=start_date,
+            date__lte=wanted[-1][0]
+        ).values_list('date', 'starts_at', 'ends_at'):
+            existing_by_date.setdefault(slot_date, []).append((starts_at, ends_at))
+
+        new_slots = []
+        for slot_date, start, end in wanted:
+            slot = cls(hr=hr, date=slot_date, start_time=start, end_time=end, is_managed=True)
+            slot.set_bounds()  # bulk_create skips save()
+            if any(slot.starts_at < ends_at and starts_at < slot.ends_at
+                   for starts_at, ends_at in existing_by_date.get(slot_date, ())):
+                continue
+            new_slots.append(slot)
+        # ignore_conflicts covers a concurrent "generate" by the same HR
+        cls.objects.bulk_create(new_slots, ignore_conflicts=True)
+        return len(new_slots)
+
+class HRSlotTemplate(models.Model):
+    """Working hours an HR's time slots are generated from"""
+    hr = models.OneToOneField(HR, on_delete=models.CASCADE, related_name='slot_template')
+    day_start = models.TimeField(default=time(9, 0))
+    day_end = models.TimeField(default=time(17, 0))
+    slot_minutes = models.PositiveSmallIntegerField(default=30)
+    blackout_days = models.CharField(max_length=20, blank=True, default='6',
+                                     help_text="Comma-separated weekdays without slots (Monday=0, Sunday=6)")
+    days_ahead = models.PositiveSmallIntegerField(default=7)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Slot template for {self.hr.full_name}"
+
+    @classmethod
+    def for_hr(cls, hr):
+        """The HR's saved template, or an unsaved one with the default hours."""
+        try:
+            return cls.objects.get(hr=hr)
+        except cls.DoesNotExist:
+            return cls(hr=hr)
+
+    @property
+    def blackout_weekdays(self):
+        return {int(day) for day in self.blackout_days.split(',') if day.strip().isdigit()}
+
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        if self.slot_minutes < 5:
+            raise ValidationError("Slots must be at least 5 minutes long.")
+        if self.day_end <= self.day_start:
+            raise ValidationError("Working hours must end after they start.")
+        if not 1 <= self.days_ahead <= 31:
+            raise ValidationError("Slots can be generated for 1 to 31 days ahead.")
+        if any(day > 6 for day in self.blackout_weekdays):
+            raise ValidationError("Blackout days must be weekdays 0-6.")
+
+    def slot_times(self):
+        """(start_time, end_time) pairs for one working day."""
+        start = datetime.combine(date.min, self.day_start)
+        day_end = datetime.combine(date.min, self.day_end)
+        length = timedelta(minutes=self.slot_minutes)
+        times = []
+        while start + length <= day_end:
+            times.append((start.time(), (start + length).time()))
+            start += length
+        return times
+
+    def slots_from(self, start_date):
+        """(date, start_time, end_time) for every slot in the next ``days_ahead`` days."""
+        times = self.slot_times()
+        blackout = self.blackout_weekdays
+        slots = []
+        for offset in range(self.days_ahead):
+            slot_date = start_date + timedelta(days=offset)
+            if slot_date.weekday() not in blackout:
+                slots.extend((slot_date, start, end) for start, end in times)
+        return slots
+
 class HRInterviewBooking(models.Model):
     """HR interview bookings by candidates"""
     candidate = models.ForeignKey(User, on_delete=models.CASCADE, related_name='hr_bookings')
@@ -176,6 +333,35 @@ class HRInterviewBooking(models.Model):
             self.time_slot.save()
         super().save(*args, **kwargs)
     
+    # How long after the start an interview can still be joined
+    JOIN_WINDOW = timedelta(minutes=10)
+
+    @classmethod
+    def upcoming_q(cls, now=None):
+        """
+        Filter for upcoming bookings: scheduled and either in the future or
+        still inside the join window. Shared by every upcoming list and count.
+        """
+        from django.utils import timezone
+        from django.db.models import Q
+        return Q(status='scheduled', time_slot__starts_at__gt=(now or timezone.now()) - cls.JOIN_WINDOW)
+
+    @classmethod
+    def mark_no_shows(cls, grace_minutes=10):
+        """
+        Mark every scheduled booking whose slot ended more than ``grace_minutes``
+        ago as no_show, in one UPDATE driven by the indexed slot ends_at.
+
+        Returns:
+            int: Number of bookings marked
+        """
+        from django.utils import timezone
+
+        cutoff = timezone.now() - timedelta(minutes=grace_minutes)
+        return cls.objects.filter(
+            status='scheduled', time_slot__ends_at__lt=cutoff
+        ).update(status='no_show', updated_at=timezone.now())
+
     @property
     def is_meeting_ready(self):
         """Allow joining within 10 minutes after the start time."""
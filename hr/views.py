@@ -2,11 +2,12 @@
 
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from django.core.mail import send_mail
-from django.conf import settings
 from django.utils import timezone
 from django.http import JsonResponse
-from .models import HR, HRTimeSlot, HRInterviewBooking, HRInterviewFeedback
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.conf import settings
+from .models import HR, HRTimeSlot, HRSlotTemplate, HRInterviewBooking, HRInterviewFeedback
 from candidate.models import PasswordResetOTP, CandidateProfile
 import hashlib
 from datetime import timedelta, datetime, date
@@ -14,38 +15,18 @@ from django.db.models import Count, Q
 from django.contrib.auth.decorators import login_required
 from django.utils.timezone import make_aware
 
-from ai_interview_platform.utils.email_service import send_brevo_email
-
+from ai_interview_platform.utils.email_service import enqueue_email
+from ai_interview_platform.utils.booking_stats import get_booking_stats
 
-def _auto_update_no_shows_for_hr(hr_user):
-    """Mark scheduled interviews as no_show if >10 minutes past start time."""
-    from datetime import datetime
-    now = datetime.now()
-    scheduled = HRInterviewBooking.objects.filter(hr=hr_user, status='scheduled').select_related('time_slot')
-    for booking in scheduled:
-        interview_end_dt = datetime.combine(booking.time_slot.date, booking.time_slot.end_time)
-        minutes_after_end = (now - interview_end_dt).total_seconds() / 60
-        # Only mark as no_show if it's more than 10 minutes after the scheduled end time
-        if minutes_after_end > 10:
-            booking.status = 'no_show'
-            booking.save()
 
 def send_email_otp(email, otp, subject, message):
-    """Send OTP via email using SMTP"""
+    """Queue the OTP email in the outbox; it is delivered via the Brevo API in the background"""
     try:
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [email],
-            fail_silently=False,
-        )
+        enqueue_email(email, subject, f"<p>{message}</p>", message)
         return True
     except Exception as e:
-        print(f"❌ Email sending failed: {e}")
+        print(f"❌ Email queueing failed: {e}")
         print(f"   Attempted to send to: {email}")
-        print(f"   Check your SMTP configuration in settings.py and .env file")
-        print(f"   Make sure EMAIL_HOST_USER and EMAIL_HOST_PASSWORD are set correctly")
         return False
 
 def login_view(request):
@@ -172,39 +153,10 @@ def dashboard_view(request):
         request.session.pop('hr_name', None)
         return redirect('hr_login')
     
-    # Auto-update missed interviews as no_show
-    _auto_update_no_shows_for_hr(hr_user)
+    # Missed interviews are marked no_show by the sweep_no_shows command
 
-    # Get current date and time for proper filtering
-    from datetime import datetime
-    now = datetime.now()
-    current_date = now.date()
-    current_time = now.time()
-    
-    # Get updated statistics
-    # Count all interviews associated with this HR (any status)
-    total_interviews_conducted = HRInterviewBooking.objects.filter(hr=hr_user).count()
-    todays_interviews_scheduled = HRInterviewBooking.objects.filter(
-        hr=hr_user, 
-        time_slot__date=current_date,
-        status='scheduled'
-    ).count()
-    
-    # Get all scheduled interviews and filter properly for upcoming ones
-    all_scheduled = HRInterviewBooking.objects.filter(
-        hr=hr_user,
-        status='scheduled'
-    ).select_related('time_slot')
-    
-    # Count truly upcoming interviews (future date OR same date within 10-minute window)
-    upcoming_count = 0
-    for interview in all_scheduled:
-        interview_datetime = datetime.combine(interview.time_slot.date, interview.time_slot.start_time)
-        time_diff_minutes = (interview_datetime - now).total_seconds() / 60
-        
-        if (interview.time_slot.date > current_date or 
-            (interview.time_slot.date == current_date and time_diff_minutes > -10)):
-            upcoming_count += 1
+    # Status, today's and upcoming counts in one query
+    stats = get_booking_stats(hr_user)
     
     # Get today's interviews with candidate profiles for join buttons
     todays_interviews = HRInterviewBooking.objects.filter(
@@ -226,9 +178,9 @@ def dashboard_view(request):
     context = {
         'hr_name': hr_name,
         'hr_user': hr_user,
-        'total_interviews_conducted': total_interviews_conducted,
-        'todays_interviews_scheduled': todays_interviews_scheduled,
-        'upcoming_interviews': upcoming_count,
+        'total_interviews_conducted': stats['total'],
+        'todays_interviews_scheduled': stats['today_scheduled'],
+        'upcoming_interviews': stats['upcoming'],
         'todays_interviews_data': todays_interviews_data,
     }
     
@@ -252,34 +204,24 @@ def manage_time_slots_view(request):
             except HRTimeSlot.DoesNotExist:
                 messages.error(request, 'Time slot not found or cannot be deleted.')
         elif action == 'add':
-            # Generate only for next 7 days from today (inclusive)
-            start_date = date.today()
-            for i in range(7):
-                current_date = start_date + timedelta(days=i)
-                # Skip Sundays (weekday(): Monday=0, Sunday=6)
-                if current_date.weekday() == 6:
-                    continue
-                day_start_hour = 9
-                day_end_hour = 17
-                for hour in range(day_start_hour, day_end_hour):
-                    for minute in [0, 30]:
-                        start_time = datetime.strptime(f"{hour:02d}:{minute:02d}", "%H:%M").time()
-                        # Calculate end time properly
-                        if minute == 30:
-                            next_end_hour = hour + 1
-                            next_end_minute = 0
-                        else:
-                            next_end_hour = hour
-                            next_end_minute = 30
-                        end_time = datetime.strptime(f"{next_end_hour:02d}:{next_end_minute:02d}", "%H:%M").time()
-                        # Use only unique constraint fields in lookup to avoid IntegrityError
-                        HRTimeSlot.objects.get_or_create(
-                            hr=hr_user,
-                            date=current_date,
-                            start_time=start_time,
-                            defaults={'end_time': end_time, 'is_managed': True}
-                        )
-            messages.success(request, 'Time slots generated for the next 7 days.')
+            template = HRSlotTemplate.for_hr(hr_user)
+            created = HRTimeSlot.generate_from_template(hr_user, template)
+            messages.success(request, f'{created} time slot(s) generated for the next {template.days_ahead} days.')
+        elif action == 'template':
+            template = HRSlotTemplate.for_hr(hr_user)
+            try:
+                template.day_start = datetime.strptime(request.POST.get('day_start', ''), "%H:%M").time()
+                template.day_end = datetime.strptime(request.POST.get('day_end', ''), "%H:%M").time()
+                template.slot_minutes = int(request.POST.get('slot_minutes', ''))
+                template.days_ahead = int(request.POST.get('days_ahead', ''))
+                template.blackout_days = ','.join(sorted(request.POST.getlist('blackout_days')))
+                template.full_clean(exclude=['hr'])
+                template.save()
+                messages.success(request, 'Working hours updated.')
+            except ValueError:
+                messages.error(request, 'Please enter valid times and numbers.')
+            except ValidationError as e:
+                messages.error(request, ' '.join(e.messages))
 
     # Show only manageable (unbooked) future slots; for today, only times after current time
     from datetime import datetime as _dt
@@ -292,9 +234,13 @@ def manage_time_slots_view(request):
         Q(date__gt=date.today()) | Q(date=date.today(), start_time__gt=now_time)
     ).order_by('date', 'start_time')
 
+    slot_template = HRSlotTemplate.for_hr(hr_user)
     context = {
         'hr_user': hr_user,
         'managed_slots': managed_slots,
+        'slot_template': slot_template,
+        'blackout_weekdays': slot_template.blackout_weekdays,
+        'weekdays': list(enumerate(['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'])),
     }
     return render(request, 'hr/manage_time_slots.html', context)
 
@@ -347,7 +293,6 @@ def todays_interviews_list_view(request):
     if 'hr_id' not in request.session:
         return redirect('hr_login')
     hr_user = HR.objects.get(id=request.session['hr_id'])
-    _auto_update_no_shows_for_hr(hr_user)
     today = date.today()
     bookings_qs = HRInterviewBooking.objects.filter(
         hr=hr_user,
@@ -373,39 +318,22 @@ def upcoming_interviews_list_view(request):
     if 'hr_id' not in request.session:
         return redirect('hr_login')
     hr_user = HR.objects.get(id=request.session['hr_id'])
-    _auto_update_no_shows_for_hr(hr_user)
-    
-    # Get current date and time for proper filtering
-    from datetime import datetime
-    now = datetime.now()
-    current_date = now.date()
-    current_time = now.time()
     
-    # Get all scheduled interviews
-    all_scheduled = HRInterviewBooking.objects.filter(
-        hr=hr_user,
-        status='scheduled'
-    ).select_related('candidate', 'time_slot')
+    now = timezone.localtime()
     
-    # Filter for truly upcoming interviews (future date OR same date within 10-minute window)
-    upcoming_bookings = []
-    for booking in all_scheduled:
-        interview_datetime = datetime.combine(booking.time_slot.date, booking.time_slot.start_time)
-        time_diff_minutes = (interview_datetime - now).total_seconds() / 60
-        
-        if (booking.time_slot.date > current_date or 
-            (booking.time_slot.date == current_date and time_diff_minutes > -10)):
-            upcoming_bookings.append(booking)
-    
-    # Sort by date and time (nearest first)
-    upcoming_bookings.sort(key=lambda x: (x.time_slot.date, x.time_slot.start_time))
+    # Upcoming = future, or started less than 10 minutes ago (joining window); nearest first
+    upcoming_qs = HRInterviewBooking.objects.filter(
+        HRInterviewBooking.upcoming_q(now),
+        hr=hr_user
+    ).select_related('candidate', 'time_slot').order_by('time_slot__starts_at')
+    page_obj = Paginator(upcoming_qs, getattr(settings, 'INTERVIEWS_PER_PAGE', 20)).get_page(request.GET.get('page'))
     
     # Get candidate profiles
-    candidate_ids = [b.candidate_id for b in upcoming_bookings]
+    candidate_ids = [b.candidate_id for b in page_obj]
     profiles_map = {p.user_id: p for p in CandidateProfile.objects.filter(user_id__in=candidate_ids)}
     
     bookings = []
-    for b in upcoming_bookings:
+    for b in page_obj:
         bookings.append({
             'booking': b,
             'profile': profiles_map.get(b.candidate_id)
@@ -414,8 +342,9 @@ def upcoming_interviews_list_view(request):
     return render(request, 'hr/upcoming_interviews_list.html', {
         'hr_user': hr_user,
         'bookings': bookings,
-        'current_date': current_date,
-        'current_time': current_time,
+        'page_obj': page_obj,
+        'current_date': now.date(),
+        'current_time': now.time(),
     })
 
 
@@ -425,7 +354,6 @@ def manage_interviews_view(request):
         return redirect('hr_login')
     
     hr_user = HR.objects.get(id=request.session['hr_id'])
-    _auto_update_no_shows_for_hr(hr_user)
     
     # Get current date and time for filtering
     from datetime import datetime
@@ -675,11 +603,7 @@ def analytics_view(request):
         time_slot__date__lte=end_date,
     )
 
-    total_interviews = month_bookings.count()
-    completed_interviews = month_bookings.filter(status='completed').count()
-    scheduled_interviews = month_bookings.filter(status='scheduled').count()
-    cancelled_interviews = month_bookings.filter(status='cancelled').count()
-    no_show_interviews = month_bookings.filter(status='no_show').count()
+    stats = get_booking_stats(hr_user, start_date, end_date)
 
     context = {
         'hr_user': hr_user,
@@ -687,11 +611,11 @@ def analytics_view(request):
         'year': year,
         'start_date': start_date,
         'end_date': end_date,
-        'total_interviews': total_interviews,
-        'completed_interviews': completed_interviews,
-        'scheduled_interviews': scheduled_interviews,
-        'cancelled_interviews': cancelled_interviews,
-        'no_show_interviews': no_show_interviews,
+        'total_interviews': stats['total'],
+        'completed_interviews': stats['completed'],
+        'scheduled_interviews': stats['scheduled'],
+        'cancelled_interviews': stats['cancelled'],
+        'no_show_interviews': stats['no_show'],
         'bookings': month_bookings.select_related('candidate', 'time_slot').order_by('time_slot__date', 'time_slot__start_time'),
     }
 